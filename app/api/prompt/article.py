@@ -3,10 +3,11 @@ from pydantic import BaseModel
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.core.responses import create_response
 
 from app.services.prompt.tag import PromptTagService
+from app.services.prompt.content import PromptContentService
 
 
 router = APIRouter(prefix="/prompt", tags=["prompt article"])
@@ -33,12 +34,14 @@ async def tag_list(
     keyword: str = Query("", description="搜索关键词"),
     page: int = Query(1, description="页码"),
     page_size: int = Query(default=10, e=10, le=10, description="每页数量"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """获取和搜索平台标签列表"""
     # 调用标签服务获取标签列表
     tag_service = PromptTagService(db)
     result = await tag_service.get_tag_list(keyword, page, page_size)
+    # 服务完成后立即归还连接
+    await db.close()
     return create_response(data=result)
 
 
@@ -53,4 +56,6 @@ async def add_article(request: Request, data: PromptArticle, db: AsyncSession =
 async def update_article(request: Request, data: UpdatePromptArticle, db: AsyncSession = Depends(get_db),
 ):
     """更新文章"""
+    # 文章内容变更后清除内容缓存
+    PromptContentService.invalidate_cache(data.id)
     return create_response()
\ No newline at end of file
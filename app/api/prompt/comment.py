@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Request, Query, Depends
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_db, get_read_db
+from app.core.auth import get_current_user_id
+from app.core.responses import create_response
+
+from app.services.prompt.comment import PromptCommentService
+
+router = APIRouter(prefix="/prompt", tags=["prompt comment"])
+
+class AddComment(BaseModel):
+    prompt_id: int = Query(description="提示词ID")
+    content: str = Query(description="评论内容")
+    parent_id: int = Query(0, description="被回复的评论ID，0表示发表根评论")
+
+class DeleteComment(BaseModel):
+    id: int = Query(description="评论ID")
+
+
+@router.get("/comment/list", summary="提示词评论列表")
+async def get_comment_list(
+    request: Request,
+    prompt_id: int = Query(description="提示词ID"),
+    cursor: str = Query(default="", description="游标，为空获取第一页"),
+    page_size: int = Query(default=20, ge=1, le=50, description="每页根评论数量"),
+    reply_limit: int = Query(default=3, ge=0, le=10, description="每条根评论附带的回复数量"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    comment_service = PromptCommentService(db)
+    try:
+        result = await comment_service.get_comments(prompt_id, cursor, page_size, reply_limit)
+    except ValueError as e:
+        return create_response(code=400, message=str(e))
+    finally:
+        # 服务完成后立即归还连接
+        await db.close()
+    return create_response(data=result)
+
+
+@router.get("/comment/replies", summary="根评论的回复列表")
+async def get_comment_replies(
+    request: Request,
+    prompt_id: int = Query(description="提示词ID"),
+    root_id: int = Query(description="根评论ID"),
+    cursor: str = Query(default="", description="游标，为空获取第一页"),
+    page_size: int = Query(default=20, ge=1, le=50, description="每页数量"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    comment_service = PromptCommentService(db)
+    try:
+        result = await comment_service.get_replies(prompt_id, root_id, cursor, page_size)
+    except ValueError as e:
+        return create_response(code=400, message=str(e))
+    finally:
+        # 服务完成后立即归还连接
+        await db.close()
+    return create_response(data=result)
+
+
+@router.post("/comment/add", summary="发表评论")
+async def add_comment(
+    request: Request,
+    data: AddComment,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    comment_service = PromptCommentService(db)
+    try:
+        result = await comment_service.add_comment(user_id, data.prompt_id, data.content, data.parent_id)
+    except ValueError as e:
+        return create_response(code=400, message=str(e))
+    return create_response(data=result)
+
+
+@router.post("/comment/delete", summary="删除评论")
+async def delete_comment(
+    request: Request,
+    data: DeleteComment,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    comment_service = PromptCommentService(db)
+    try:
+        await comment_service.delete_comment(user_id, data.id)
+    except ValueError as e:
+        return create_response(code=400, message=str(e))
+    return create_response()
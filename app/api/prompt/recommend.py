@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Request, Query, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Request, Response, Query, Depends
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_db
-from app.core.responses import create_response
+from app.core.db import get_db, get_read_db
+from app.core.auth import get_optional_user_id
+from app.core.responses import create_response, create_encoded_response
 
-from app.services.prompt.tag import PromptTagService
+from app.services.prompt.tag import public_tag_snapshot
+from app.services.prompt.clicks import tag_click_buffer
+from app.services.prompt.tagindex import tag_index
 from app.services.prompt.recommend import PromptRecommendService
 from app.services.prompt.content import PromptContentService
 
@@ -16,12 +21,25 @@ class RecommendPrompt(BaseModel):
     page_size: int = Query(default=15, ge=15, le=15, description="每页数量")
     tag_id: int = Query(default=0, description="标签ID，0表示全部")
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断 If-None-Match 请求头是否包含当前 ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
 @router.get("/public/tag", summary="首页公开标签列表")
-async def get_tag_list(request: Request, db: AsyncSession = Depends(get_db)):
-    # 调用标签服务获取公开标签列表
-    tag_service = PromptTagService(db)
-    tag_list = await tag_service.get_public_tag_list()
-    return create_response(data=tag_list)
+async def get_tag_list(request: Request):
+    # 直接返回公开标签快照，客户端缓存未变化时返回304
+    body, etag = await public_tag_snapshot.get()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/recommend", summary="推荐的提示词列表")
@@ -30,11 +48,26 @@ async def get_prompt_list(
     tag_id: int = Query(default=0, description="标签ID，0表示全部"),
     page: int = Query(default=1, ge=1, description="页码"),
     page_size: int = Query(default=15, ge=15, le=15, description="每页数量"),
-    db: AsyncSession = Depends(get_db)
+    cursor: str = Query(default=None, description="游标，传空字符串获取第一页，传入后忽略page"),
+    user_id: Optional[int] = Depends(get_optional_user_id),
+    db: AsyncSession = Depends(get_read_db)
 ):
+    # 按标签浏览的第一页视为一次标签点击，不存在或已禁用的标签不计入
+    if tag_id and (cursor == "" or (cursor is None and page == 1)) and tag_index.contains(tag_id):
+        tag_click_buffer.record(tag_id)
+
     # 调用推荐服务获取推荐提示词列表
     recommend_service = PromptRecommendService(db)
-    result = await recommend_service.get_recommend_prompts(page, page_size, tag_id)
+    try:
+        if cursor is None:
+            result = await recommend_service.get_recommend_prompts(page, page_size, tag_id, user_id)
+        else:
+            result = await recommend_service.get_recommend_prompts_by_cursor(cursor, page_size, tag_id, user_id)
+    except ValueError as e:
+        return create_response(code=400, message=str(e))
+    finally:
+        # 服务完成后立即归还连接
+        await db.close()
     return create_response(data=result)
 
 
@@ -42,9 +75,15 @@ async def get_prompt_list(
 async def get_prompt_content(
     request: Request,
     prompt_id: int = Query(description="提示词ID"),
+    user_id: Optional[int] = Depends(get_optional_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     # 调用提示词内容服务获取内容
     content_service = PromptContentService(db)
-    result = await content_service.get_prompt_content(prompt_id, 6)
-    return create_response(data=result)
\ No newline at end of file
+    result = await content_service.get_prompt_content(prompt_id, user_id)
+    # 服务完成后立即归还连接
+    await db.close()
+    if result is None:
+        return create_response(data={})
+    # 内容已编码为JSON，直接拼入响应体
+    return create_encoded_response(result)
\ No newline at end of file
@@ -1,22 +1,46 @@
-from fastapi import APIRouter, Request, Query
+from typing import Optional
+
+from fastapi import APIRouter, Request, Query, Depends
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_db
+from app.core.auth import get_optional_user_id
 from app.core.responses import create_response
 
+from app.services.prompt.search import PromptSearchService
+from app.services.prompt.hotkey import hot_keyword_board
+
 router = APIRouter(prefix="/prompt", tags=["prompt search"])
 
 class SearchPrompt(BaseModel):
     keyword: str
-    page: int = Query(1, description="页码")
-    page_size: int = Query(le=10, description="每页数量")
+    page: int = Query(1, ge=1, description="页码")
+    page_size: int = Query(10, ge=1, le=10, description="每页数量")
+    cursor: Optional[str] = Query(None, description="游标，传空字符串获取第一页，传入后忽略page")
 
 
 @router.post("/search", summary="搜索提示词")
-async def search_prompt(request: Request, data: SearchPrompt):
-    return []
+async def search_prompt(
+    request: Request,
+    data: SearchPrompt,
+    user_id: Optional[int] = Depends(get_optional_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        search_service = PromptSearchService(db)
+        result = await search_service.search_prompts(data.keyword, data.page, data.page_size, data.cursor, user_id)
+        return create_response(data=result)
+    except ValueError as e:
+        return create_response(code=400, message=str(e))
+    finally:
+        # 服务完成后立即归还连接
+        await db.close()
 
 
 @router.get("/search/hotkey", summary="获取热门搜索关键词排行榜")
-async def search_prompt_hotkey(request: Request):
-    return []
\ No newline at end of file
+async def search_prompt_hotkey(
+    request: Request,
+    limit: int = Query(default=10, ge=1, le=50, description="返回数量"),
+):
+    return create_response(data=hot_keyword_board.top(limit))
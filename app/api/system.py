@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Request
+
+from app.core.config import settings
+from app.core.auth import token_cache
+from app.core.db import engine, pool_status, replicas
+from app.core.responses import create_response
+
+from app.services.prompt.content import prompt_content_cache
+from app.services.prompt.views import view_buffer
+from app.services.prompt.clicks import tag_click_buffer
+from app.services.prompt.counters import counter_pipeline
+from app.services.user.relation import relation_resolver
+from app.services.verification import email_queue, sms_queue, sms_status_poller
+from app.utils.password import password_hasher
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/stats", summary="进程内缓存和缓冲统计信息")
+async def get_system_stats(request: Request):
+    # 仅在调试模式下开放
+    if not settings.DEBUG:
+        return create_response(code=404, message="请求的资源不存在")
+
+    return create_response(data={
+        "db_pool": pool_status(engine),
+        "db_replicas": replicas.stats(),
+        "prompt_content_cache": prompt_content_cache.stats(),
+        "view_buffer": view_buffer.stats(),
+        "tag_click_buffer": tag_click_buffer.stats(),
+        "counter_pipeline": counter_pipeline.stats(),
+        "token_cache": token_cache.stats(),
+        "relation_resolver": relation_resolver.stats(),
+        "password_hasher": password_hasher.stats(),
+        "email_queue": email_queue.stats(),
+        "sms_queue": sms_queue.stats(),
+        "sms_status": sms_status_poller.stats(),
+    })
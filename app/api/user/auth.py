@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.responses import create_response
 from app.core.db import get_db
+from app.core.auth import get_access_token
 
 from app.services.user import UserAuthService
 
@@ -107,7 +108,7 @@ async def refresh_access_token(data: RefreshToken, db: AsyncSession = Depends(ge
 async def user_logout(request: Request, db: AsyncSession = Depends(get_db)):
     try:
         # 从Authorization请求头中获取访问令牌
-        access_token = request.headers.get("Authorization")
+        access_token = get_access_token(request)
         auth_service = UserAuthService(db)
         await auth_service.logout(access_token)
         return create_response(message="退出登录成功")
@@ -18,8 +18,10 @@ async def send_email_verify_code(request: Request, data: EmailVerifyCode, db: As
     try:
         verification_service = VerificationCodeService(db)
         verification_service.is_email(data.target)
-        await verification_service.create_code(data.target, "LexTrade 注册验证码")
+        await verification_service.create_code(data.target, "LexTrade 注册验证码", client_ip=request.client.host)
         return create_response(message="验证码发送成功")
+    except HTTPException:
+        raise
     except ValueError as e:
         return create_response(code=400, message=str(e))
     except Exception as e:
@@ -1,3 +1,4 @@
+from . import auth
 from . import config
 from . import db
 from . import exceptions
@@ -0,0 +1,126 @@
+"""认证模块
+
+提供基于访问令牌的认证依赖，令牌解析结果缓存在进程内：
+有效令牌缓存 (user_id, 过期时间)，无效令牌短时间负缓存，退出登录和刷新令牌时立即失效。
+"""
+
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import select
+from starlette.exceptions import HTTPException
+
+from app.core.db import SessionLocal
+from app.models import UserTokens
+from app.utils.cache import TTLCache
+
+_INVALID = (0, None)
+
+
+class TokenCache:
+    """访问令牌缓存"""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300, negative_ttl: float = 30):
+        """初始化令牌缓存
+
+        Args:
+            maxsize: 最大缓存令牌数
+            ttl: 有效令牌的缓存时间（秒），多进程部署时也是其他进程感知令牌失效的最长延迟
+            negative_ttl: 无效令牌的缓存时间（秒）
+        """
+        self.negative_ttl = negative_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, token: str) -> Optional[Tuple[int, Optional[datetime]]]:
+        """获取缓存的令牌信息
+
+        Returns:
+            Optional[Tuple]: 未缓存返回None，无效令牌返回 (0, None)，否则返回 (user_id, 过期时间)
+        """
+        return self._cache.get(token)
+
+    def set(self, token: str, user_id: int, expires_at: datetime) -> None:
+        """缓存有效令牌，缓存时间不超过令牌剩余有效期"""
+        remaining = (expires_at - datetime.utcnow()).total_seconds()
+        if remaining > 0:
+            self._cache.set(token, (user_id, expires_at), ttl=min(self._cache.ttl, remaining))
+
+    def set_invalid(self, token: str) -> None:
+        """缓存无效令牌"""
+        self._cache.set(token, _INVALID, ttl=self.negative_ttl)
+
+    def invalidate(self, token: Optional[str]) -> None:
+        """令牌被注销或替换后立即失效"""
+        if token:
+            self._cache.invalidate(token)
+
+    def stats(self) -> dict:
+        """获取缓存统计信息"""
+        return self._cache.stats()
+
+
+# 进程内共享的令牌缓存
+token_cache = TokenCache()
+
+
+def get_access_token(request: Request) -> Optional[str]:
+    """从Authorization请求头中获取访问令牌，兼容Bearer前缀"""
+    authorization = request.headers.get("Authorization")
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if token and scheme.lower() == "bearer":
+        return token.strip()
+    return authorization.strip()
+
+
+async def resolve_token(access_token: str) -> Optional[int]:
+    """解析访问令牌对应的用户ID
+
+    Args:
+        access_token: 访问令牌
+
+    Returns:
+        Optional[int]: 用户ID，令牌无效或已过期返回None
+    """
+    cached = token_cache.get(access_token)
+    if cached is None:
+        async with SessionLocal() as session:
+            result = await session.execute(
+                select(UserTokens.user_id, UserTokens.access_expires_at)
+                .where(UserTokens.access_token == access_token)
+            )
+            row = result.first()
+
+        if row is None or row.access_expires_at is None:
+            token_cache.set_invalid(access_token)
+            return None
+
+        cached = (row.user_id, row.access_expires_at)
+        token_cache.set(access_token, *cached)
+
+    user_id, expires_at = cached
+    if not user_id or expires_at < datetime.utcnow():
+        return None
+    return user_id
+
+
+async def get_optional_user_id(request: Request) -> Optional[int]:
+    """获取当前登录用户ID，未登录时返回None"""
+    access_token = get_access_token(request)
+    if not access_token:
+        return None
+    return await resolve_token(access_token)
+
+
+async def get_current_user_id(request: Request) -> int:
+    """获取当前登录用户ID
+
+    Raises:
+        HTTPException: 未登录或令牌无效时返回401
+    """
+    user_id = await get_optional_user_id(request)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="请先登录")
+    return user_id
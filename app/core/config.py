@@ -22,6 +22,21 @@ class Settings():
     DEBUG: bool = os.getenv("LEX_DEBUG", "False").lower() == "true" # 调试模式开关
     DATABASE_URL: str = os.getenv("LEX_DATABASE_URL") # 数据库设置
 
+    # 数据库连接池设置，每个uvicorn worker进程各自持有一个连接池，
+    # 数据库最大连接数应不小于 worker数 * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    DB_POOL_SIZE: int = int(os.getenv("LEX_DB_POOL_SIZE", "5")) # 常驻连接数
+    DB_MAX_OVERFLOW: int = int(os.getenv("LEX_DB_MAX_OVERFLOW", "10")) # 超出常驻连接数后允许临时创建的连接数
+    DB_POOL_TIMEOUT: float = float(os.getenv("LEX_DB_POOL_TIMEOUT", "30")) # 等待可用连接的超时秒数
+    DB_POOL_RECYCLE: int = int(os.getenv("LEX_DB_POOL_RECYCLE", "3600")) # 连接回收秒数
+    DB_ECHO: bool = os.getenv("LEX_DB_ECHO", "False").lower() == "true" # 是否打印SQL语句
+    DB_POOL_LOG_INTERVAL: float = float(os.getenv("LEX_DB_POOL_LOG_INTERVAL", "60")) # 定时输出连接池统计的间隔秒数，0表示不输出
+
+    # 只读副本设置，多个地址用英文逗号分隔，为空时所有读写都走主库
+    DATABASE_REPLICA_URLS: list = [url.strip() for url in os.getenv("LEX_DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    DB_REPLICA_MAX_LAG: float = float(os.getenv("LEX_DB_REPLICA_MAX_LAG", "5")) # 副本最大允许延迟秒数，超过后回退到主库
+    DB_REPLICA_CHECK_INTERVAL: float = float(os.getenv("LEX_DB_REPLICA_CHECK_INTERVAL", "5")) # 副本延迟检测间隔秒数
+    DB_READ_STICKY_SECONDS: float = float(os.getenv("LEX_DB_READ_STICKY_SECONDS", "5")) # 客户端写入后读请求继续走主库的秒数
+
 class SMTP():
     """
     邮件服务配置
@@ -40,6 +55,8 @@ class SMS():
     ACCESS_KEY_ID: str = os.getenv("LEX_SMS_ACCESS_KEY_ID")
     ACCESS_KEY_SECRET: str = os.getenv("LEX_SMS_ACCESS_KEY_SECRET")
     SIGN_NAME: str = os.getenv("LEX_SMS_SIGN_NAME")
+    ENDPOINT: str = os.getenv("LEX_SMS_ENDPOINT") or "dysmsapi.aliyuncs.com"
+    VERIFY_TEMPLATE_CODE: str = os.getenv("LEX_SMS_VERIFY_TEMPLATE_CODE", "VERIFY_CODE")
 
 # 实例化配置类
 settings = Settings()
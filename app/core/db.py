@@ -2,32 +2,352 @@
 数据库配置和连接管理
 """
 
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.periodic import PeriodicTask
+
+
+class PoolMetrics:
+    """连接池统计
+
+    记录取用连接的等待时间、持有时间和超时次数，用于根据 worker 数量调整连接池大小。
+    """
+
+    def __init__(self, window: int = 1000):
+        """
+        Args:
+            window: 计算等待时间分位数时保留的最近样本数
+        """
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_hold = 0.0
+        self.max_hold = 0.0
+        self.checkins = 0
+        self._recent_waits = deque(maxlen=window)
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+        self._recent_waits.append(seconds)
+
+    def record_hold(self, seconds: float) -> None:
+        self.checkins += 1
+        self.total_hold += seconds
+        self.max_hold = max(self.max_hold, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._recent_waits)
+
+        def percentile(p: float) -> float:
+            return waits[min(len(waits) - 1, int(len(waits) * p))] if waits else 0.0
+
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+            "p99_wait_ms": percentile(0.99) * 1000,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_hold_ms": self.total_hold / self.checkins * 1000 if self.checkins else 0.0,
+            "max_hold_ms": self.max_hold * 1000,
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """记录取用等待时间和超时次数的连接池"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() 会重建连接池，保留统计信息
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+
+def create_engine(url: str):
+    """创建带连接池统计的异步数据库引擎
+
+    Args:
+        url: 数据库连接地址
+    """
+    new_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,        # 常驻连接数
+        max_overflow=settings.DB_MAX_OVERFLOW,  # 临时连接数
+        pool_timeout=settings.DB_POOL_TIMEOUT,  # 等待连接超时秒数
+        pool_pre_ping=True,  # 自动检测断开的连接
+        pool_recycle=settings.DB_POOL_RECYCLE,   # 连接回收秒数
+        echo=settings.DB_ECHO, # 是否打印SQL语句
+    )
+
+    pool = new_engine.sync_engine.pool
+    metrics = pool.metrics = PoolMetrics()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checkout_at = connection_record.info.pop("checkout_at", None)
+        if checkout_at is not None:
+            metrics.record_hold(time.perf_counter() - checkout_at)
+
+    return new_engine
+
+
+def pool_status(target_engine) -> Dict[str, Any]:
+    """获取引擎连接池状态
+
+    Returns:
+        Dict: 连接池大小、使用中连接数、溢出连接数及统计信息
+    """
+    pool = target_engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # SQLAlchemy 的 overflow 计数在常驻连接未建满时为负数，只报告正在使用的溢出连接数
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **pool.metrics.stats(),
+    }
+
+
+def format_pool_status(status: Dict[str, Any]) -> str:
+    """将连接池状态格式化为一行日志"""
+    return (
+        f"size={status['size']} checked_out={status['checked_out']} overflow={status['overflow']}/{status['max_overflow']} "
+        f"checkouts={status['checkouts']} timeouts={status['timeouts']} "
+        f"avg_wait={status['avg_wait_ms']:.1f}ms p99_wait={status['p99_wait_ms']:.1f}ms "
+        f"avg_hold={status['avg_hold_ms']:.1f}ms max_hold={status['max_hold_ms']:.1f}ms"
+    )
+
+
+class ReplicaSet(PeriodicTask):
+    """只读副本集合
+
+    定时检测每个副本的复制延迟，只有检测成功且延迟不超过 max_lag 的副本会被选中，
+    尚未检测或全部不可用时返回 None，由调用方回退到主库。
+    """
+
+    # (语句, 延迟列名)，MySQL 8.0.22 起使用 REPLICA 语法
+    LAG_QUERIES = (
+        ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+        ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+    )
+
+    def __init__(self, urls: List[str], max_lag: float = 5, interval: float = 5):
+        """初始化副本集合
+
+        Args:
+            urls: 副本数据库连接地址列表
+            max_lag: 最大允许复制延迟（秒）
+            interval: 延迟检测间隔（秒）
+        """
+        super().__init__(interval)
+        self.max_lag = max_lag
+        self.engines = [create_engine(url) for url in urls]
+        self._lags: List[Optional[float]] = [None] * len(self.engines)  # None 表示未检测或不可用
+        self._next = 0
+        self._metrics = {"routed": 0, "fallbacks": 0, "probe_errors": 0}
+
+    def choose(self):
+        """轮询选择一个可用副本
+
+        Returns:
+            AsyncEngine: 副本引擎，没有可用副本时返回 None
+        """
+        healthy = [
+            replica for replica, lag in zip(self.engines, self._lags)
+            if lag is not None and lag <= self.max_lag
+        ]
+        if not healthy:
+            if self.engines:
+                self._metrics["fallbacks"] += 1
+            return None
+
+        self._next = (self._next + 1) % len(healthy)
+        self._metrics["routed"] += 1
+        return healthy[self._next]
+
+    async def _probe(self, replica) -> Optional[float]:
+        """查询单个副本的复制延迟"""
+        try:
+            async with replica.connect() as conn:
+                if conn.dialect.name != "mysql":
+                    # 非 MySQL（如本地 SQLite 测试库）没有复制状态，能连接即视为无延迟
+                    await conn.execute(text("SELECT 1"))
+                    return 0.0
+
+                for statement, column in self.LAG_QUERIES:
+                    try:
+                        row = (await conn.execute(text(statement))).mappings().first()
+                    except DBAPIError:
+                        continue
+                    if row is None:
+                        # 未配置复制，视为与主库一致
+                        return 0.0
+                    # 复制线程停止时延迟为 NULL，不可用
+                    lag = row.get(column)
+                    return None if lag is None else float(lag)
+        except Exception:
+            self._metrics["probe_errors"] += 1
+        return None
+
+    async def run_once(self) -> None:
+        """检测所有副本的复制延迟"""
+        if self.engines:
+            self._lags = list(await asyncio.gather(*(self._probe(replica) for replica in self.engines)))
+
+    async def dispose(self) -> None:
+        """关闭所有副本连接池"""
+        for replica in self.engines:
+            await replica.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取副本状态和路由统计信息"""
+        return {
+            **self._metrics,
+            "replicas": [
+                {"lag": lag, "healthy": lag is not None and lag <= self.max_lag, "pool": pool_status(replica)}
+                for replica, lag in zip(self.engines, self._lags)
+            ],
+        }
+
+
+class RoutingSession(Session):
+    """读写分离会话
+
+    标记为只读（info["read_only"]）的会话在没有写入时将查询路由到副本，
+    同一会话固定使用首次选中的副本；发生写入或没有可用副本时使用主库。
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if clause is not None and getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+
+        if self.info.get("read_only") and not self.info.get("wrote") and not self._flushing:
+            if "replica" not in self.info:
+                self.info["replica"] = replicas.choose()
+            replica = self.info["replica"]
+            if replica is not None:
+                return replica.sync_engine
+
+        return engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_writer(session):
+    # 提交了写入的客户端在 DB_READ_STICKY_SECONDS 内读主库，保证读到自己的写入
+    if session.info.pop("wrote", False) and session.info.get("client_key"):
+        recent_writers.set(session.info["client_key"], True)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_written(session):
+    session.info.pop("wrote", None)
+
+
+def _client_key(request: Request) -> str:
+    """识别客户端：已登录使用令牌，否则使用IP"""
+    authorization = request.headers.get("Authorization")
+    if authorization:
+        return authorization
+    return f"ip:{request.client.host}" if request.client else ""
+
 
 # 创建异步数据库引擎
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # 自动检测断开的连接
-    pool_recycle=3600,   # 连接回收秒数
-    echo=False, # 是否打印SQL语句
+engine = create_engine(settings.DATABASE_URL)
+
+# 只读副本，未配置时所有查询都走主库
+replicas = ReplicaSet(
+    settings.DATABASE_REPLICA_URLS,
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    interval=settings.DB_REPLICA_CHECK_INTERVAL,
 )
 
+class PoolStatsLogger(PeriodicTask):
+    """连接池统计日志
+
+    /system/stats 只在调试模式下开放，生产环境通过定时输出的日志观察各 worker 的连接池等待和超时情况。
+    """
+
+    async def run_once(self) -> None:
+        print(f"-数据库连接池 primary {format_pool_status(pool_status(engine))}")
+        for index, replica in enumerate(replicas.engines):
+            print(f"-数据库连接池 replica{index} {format_pool_status(pool_status(replica))}")
+
+
+pool_stats_logger = PoolStatsLogger(settings.DB_POOL_LOG_INTERVAL)
+
+# 最近提交过写入的客户端
+recent_writers = TTLCache(maxsize=100000, ttl=settings.DB_READ_STICKY_SECONDS)
+
 # 创建异步会话工厂
 SessionLocal = async_sessionmaker(
     engine,                 # 绑定引擎
     class_=AsyncSession,    # 使用异步会话
+    sync_session_class=RoutingSession, # 读写分离路由
     expire_on_commit=False, # 提交后不过期
     autocommit=False,       # 自动提交
     autoflush=False,        # 自动刷新
 )
 
-async def get_db():
+async def get_db(request: Request):
     """
     获取数据库会话
+
+    AsyncSession 在首次执行查询时才从连接池取用连接，服务完成后可调用 close 提前归还连接，
+    不必等到响应序列化结束，关闭后的会话再次使用时会重新取用连接
+    """
+    async with SessionLocal() as session:
+        session.info["client_key"] = _client_key(request)
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def get_read_db(request: Request):
+    """
+    获取只读数据库会话，优先使用副本
+
+    客户端最近提交过写入时仍使用主库
     """
+    client_key = _client_key(request)
     async with SessionLocal() as session:
+        session.info["client_key"] = client_key
+        session.info["read_only"] = recent_writers.peek(client_key) is None
         try:
             yield session
         finally:
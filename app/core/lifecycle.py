@@ -6,15 +6,35 @@ from fastapi import FastAPI
 from sqlalchemy import text
 from contextlib import asynccontextmanager
 
-from app.core.db import engine
+from app.core.db import engine, replicas, pool_stats_logger
 from app.core.config import settings
 
+async def _stop_tasks(tasks) -> None:
+    """逐个停止后台任务，单个任务停止或最后一次写回失败不影响其余任务"""
+    for name, task in tasks:
+        try:
+            await task.stop()
+        except Exception as e:
+            print(f"\033[91m-{name}停止失败\033[0m", repr(e))
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理器
 
     负责管理应用启动和关闭时的资源初始化和清理工作
     """
+    # 服务层依赖 app.core，在此处导入以避免循环导入
+    from app.services.prompt.feed import hot_feed
+    from app.services.prompt.views import view_buffer
+    from app.services.prompt.search import search_record_buffer
+    from app.services.prompt.hotkey import hot_keyword_board
+    from app.services.prompt.tag import public_tag_snapshot
+    from app.services.prompt.tagindex import tag_index
+    from app.services.prompt.clicks import tag_click_buffer
+    from app.services.prompt.counters import counter_pipeline
+    from app.services.verification import email_queue, code_reaper, sms_queue, sms_status_poller
+    from app.utils.password import password_hasher
 
     if settings.DEBUG:
         print("\033[93m请注意！！！当前为调试模式！！！切勿在生产环境中运行！！！\033[0m")
@@ -26,10 +46,36 @@ async def lifespan(app: FastAPI):
         async with engine.connect() as conn:
             await conn.execute(text("SELECT 1"))
             print("\033[92m-数据库连接测试成功\033[0m")
+
+        # 启动后台任务，关闭时按相反顺序停止
+        tasks = [
+            ("数据库副本检测", replicas),
+            ("热门推荐流", hot_feed),
+            ("公开标签快照", public_tag_snapshot),
+            ("标签索引", tag_index),
+            ("标签点击量写回", tag_click_buffer),
+            ("计数写回", counter_pipeline),
+            ("浏览量写回", view_buffer),
+            ("搜索记录写回", search_record_buffer),
+            ("热门搜索榜", hot_keyword_board),
+            ("邮件投递队列", email_queue),
+            ("验证码清理", code_reaper),
+            ("短信状态查询", sms_status_poller),
+            ("短信投递队列", sms_queue),
+        ]
+        if settings.DB_POOL_LOG_INTERVAL > 0:
+            tasks.insert(1, ("连接池统计日志", pool_stats_logger))
+        for _, task in tasks:
+            task.start()
+
         yield
+
+        await _stop_tasks(reversed(tasks))
+        password_hasher.shutdown()
         print("\033[92m-应用已关闭\033[0m")
     except Exception as e:
         print("\033[91m-数据库连接测试失败\033[0m", e)
     finally:
         # 关闭时的清理操作
-        await engine.dispose() # 关闭数据库连接池
\ No newline at end of file
+        await engine.dispose() # 关闭数据库连接池
+        await replicas.dispose()
\ No newline at end of file
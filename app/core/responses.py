@@ -2,8 +2,47 @@
 
 提供统一的API响应格式处理
 """
-from typing import Any, Optional
-from fastapi.responses import JSONResponse
+import decimal
+from typing import Any, Optional, Type
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+
+def _default(obj: Any) -> Any:
+    """orjson无法直接序列化的类型"""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # 其余类型（如pydantic模型）交给FastAPI的编码器处理
+    return jsonable_encoder(obj)
+
+
+def encode_content(content: Any) -> bytes:
+    """使用orjson将响应内容编码为JSON字节"""
+    return orjson.dumps(
+        content,
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS,
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    """基于orjson的JSON响应
+
+    datetime/date 输出为ISO格式，中文直接以UTF-8输出不做 \\u 转义，
+    字典允许非字符串键（如以ID为键的字典）。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return encode_content(content)
+
+
+# create_response 使用的响应类，可替换为其他 JSONResponse 子类
+response_class: Type[JSONResponse] = FastJSONResponse
+
 
 def create_response(
     code: int = 200,
@@ -22,11 +61,30 @@ def create_response(
         JSONResponse: FastAPI的JSON响应对象
     """
 
-    return JSONResponse(
+    return response_class(
         status_code=code,
         content={
             "code": code,
             "msg": message,
             "data": data
         }
-    )
\ No newline at end of file
+    )
+
+
+def create_encoded_response(data: bytes, code: int = 200, message: str = "成功") -> Response:
+    """使用已编码为JSON的 data 创建统一格式的API响应，避免重复序列化缓存的内容
+
+    Args:
+        data: 编码好的JSON字节
+        code: HTTP状态码
+        message: 响应消息
+
+    Returns:
+        Response: FastAPI的响应对象
+    """
+    head = encode_content({"code": code, "msg": message})[:-1]
+    return Response(
+        status_code=code,
+        content=head + b',"data":' + data + b"}",
+        media_type="application/json",
+    )
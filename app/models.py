@@ -31,6 +31,7 @@ class PromptComments(Base):
         Index('idx_comment_tree', 'prompt_id', 'root_id', 'parent_id'),
         Index('idx_prompt_created_time', 'prompt_id', 'created_at'),
         Index('idx_prompt_root_parent', 'prompt_id', 'root_id', 'parent_id'),
+        Index('idx_prompt_root_created', 'prompt_id', 'root_id', 'is_deleted', 'created_at', 'id'),
         Index('idx_user_comments', 'user_id', 'created_at'),
         {'comment': '提示词评论表'}
     )
@@ -48,7 +49,10 @@ class PromptComments(Base):
 
 class PromptSearchRecords(Base):
     __tablename__ = 'prompt_search_records'
-    __table_args__ = {'comment': '提示词搜索关键词记录'}
+    __table_args__ = (
+        Index('uk_keyword', 'keyword', unique=True),
+        {'comment': '提示词搜索关键词记录'}
+    )
 
     id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
     keyword: Mapped[str] = mapped_column(String(50, 'utf8mb4_general_ci'), comment='被搜索关键词')
@@ -103,7 +107,8 @@ class PromptTagRelation(Base):
 class Prompts(Base):
     __tablename__ = 'prompts'
     __table_args__ = (
-        Index('ft_content_search', 'title', 'summary_content', 'content'),
+        Index('ft_content_search', 'title', 'summary_content', 'content', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        Index('idx_feed_rank', 'status', 'is_deleted', 'view_count', 'created_at', 'id'),
         Index('idx_user_id', 'user_id'),
         {'comment': '提示词文章表'}
     )
@@ -274,8 +279,8 @@ class UserViewPrompts(Base):
         {'comment': '用户浏览提示词记录表'}
     )
 
+    user_id: Mapped[int] = mapped_column(BIGINT, primary_key=True, comment='用户ID')
     prompt_id: Mapped[int] = mapped_column(BIGINT, primary_key=True, comment='提示词ID')
-    user_id: Mapped[int] = mapped_column(BIGINT, comment='用户ID')
     view_at: Mapped[Optional[datetime.datetime]] = mapped_column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'), comment='浏览时间')
 
 
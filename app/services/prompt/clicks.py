@@ -0,0 +1,107 @@
+"""标签点击量写回缓冲
+
+首页点击标签时只在内存中累加点击量，由后台任务定时将累计增量批量写回 prompt_tag 和 prompt_tag_public，
+每张表每个周期一条UPDATE，避免热门标签每次点击都对同一行加锁更新。
+内存中的标签索引即时累加点击量；公开标签快照不随写回失效，由其定时刷新带上新的排序，
+避免每个刷新周期都改变 ETag 使首页的304缓存失效。
+
+丢失边界：进程异常退出时最多丢失一个刷新周期内的点击记录，正常关闭时会完成最后一次刷新。
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import update, case
+
+from app.core.db import SessionLocal
+from app.models import PromptTag, PromptTagPublic
+from app.services.prompt.tagindex import tag_index
+from app.utils.periodic import PeriodicTask
+
+
+class TagClickBuffer(PeriodicTask):
+    """标签点击量写回缓冲"""
+
+    def __init__(self, interval: float = 5, max_pending: int = 10000):
+        """初始化点击量缓冲
+
+        Args:
+            interval: 刷新间隔（秒）
+            max_pending: 缓冲的最大标签数，超过后新标签的点击被丢弃并计入lost
+        """
+        super().__init__(interval)
+        self.max_pending = max_pending
+        self._clicks: Dict[int, int] = {}
+        self._metrics = {
+            "recorded": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "flushed_clicks": 0,
+            "lost": 0,
+            "last_flush_at": None,
+            "last_flush_seconds": 0.0,
+        }
+
+    def record(self, tag_id: int, clicks: int = 1) -> None:
+        """记录标签点击
+
+        Args:
+            tag_id: 标签ID（即公开标签的 real_tag_id），调用方需先确认标签存在
+            clicks: 点击次数
+        """
+        if len(self._clicks) >= self.max_pending and tag_id not in self._clicks:
+            self._metrics["lost"] += clicks
+            return
+
+        self._clicks[tag_id] = self._clicks.get(tag_id, 0) + clicks
+        self._metrics["recorded"] += clicks
+        tag_index.bump(tag_id, clicks)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓冲统计信息"""
+        return {**self._metrics, "pending": len(self._clicks)}
+
+    async def run_once(self) -> None:
+        """将缓冲的点击量批量写回数据库"""
+        if not self._clicks:
+            return
+
+        clicks, self._clicks = self._clicks, {}
+        started = time.monotonic()
+
+        try:
+            async with SessionLocal() as session:
+                await session.execute(
+                    update(PromptTag).where(
+                        PromptTag.id.in_(list(clicks))
+                    ).values(
+                        click_count=PromptTag.click_count + case(clicks, value=PromptTag.id, else_=0)
+                    )
+                )
+                await session.execute(
+                    update(PromptTagPublic).where(
+                        PromptTagPublic.real_tag_id.in_(list(clicks))
+                    ).values(
+                        click_count=PromptTagPublic.click_count + case(clicks, value=PromptTagPublic.real_tag_id, else_=0)
+                    )
+                )
+                await session.commit()
+        except Exception:
+            # 写回失败时合并回缓冲，等待下次重试
+            self._metrics["flush_errors"] += 1
+            for tag_id, count in clicks.items():
+                self._clicks[tag_id] = self._clicks.get(tag_id, 0) + count
+            raise
+
+        self._metrics["flushes"] += 1
+        self._metrics["flushed_clicks"] += sum(clicks.values())
+        self._metrics["last_flush_at"] = str(datetime.now())
+        self._metrics["last_flush_seconds"] = time.monotonic() - started
+
+    async def on_stop(self) -> None:
+        await self.run_once()
+
+
+# 进程内共享的标签点击量缓冲
+tag_click_buffer = TagClickBuffer()
@@ -0,0 +1,341 @@
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select, func, or_, and_, desc, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models import PromptComments, Prompts, Users
+from app.utils.cursor import encode_cursor, decode_cursor
+
+
+def _format_time(value) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+
+class PromptCommentService:
+    """
+    提示词评论服务
+
+    评论为两级结构：根评论的 root_id、parent_id 为0，回复的 root_id 为所属根评论，
+    parent_id 为被回复的评论。读取一页评论最多四次查询：根评论、回复数、每条根评论的前N条回复、作者信息。
+    """
+
+    # 评论内容最大长度，与 prompt_comments.content 一致
+    MAX_CONTENT_LENGTH = 200
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def get_users(self, user_ids: Iterable[int]) -> Dict[int, Users]:
+        """
+        批量获取评论作者信息
+
+        Returns:
+            dict: key为用户ID，value为用户对象
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return {}
+        query = select(Users).where(
+            Users.id.in_(user_ids),
+            Users.status == 1,
+            Users.is_deleted == 0
+        )
+        result = await self.db.execute(query)
+        return {user.id: user for user in result.scalars().all()}
+
+    def _format_comment(self, comment, users: Dict[int, Users], reply_to_user_id: int = None) -> dict:
+        user = users.get(comment.user_id)
+        reply_to = None
+        if reply_to_user_id:
+            reply_user = users.get(reply_to_user_id)
+            reply_to = {
+                "id": reply_to_user_id,
+                "nickname": reply_user.nickname if reply_user else None,
+            }
+
+        return {
+            "id": comment.id,
+            "content": comment.content,
+            "like_count": comment.likes_count or 0,
+            "created_at": _format_time(comment.created_at),
+            "author": {
+                "id": comment.user_id,
+                "nickname": user.nickname if user else None,
+                "avatar_url": user.avatar_url if user else None,
+            },
+            "reply_to": reply_to,
+        }
+
+    async def _get_top_replies(self, prompt_id: int, root_ids: List[int], reply_limit: int) -> list:
+        """
+        获取每条根评论最早的 reply_limit 条回复
+
+        每条根评论单独 LIMIT 后 UNION ALL，各自在 idx_prompt_root_created 上做有界范围扫描，
+        读取行数为 根评论数 × reply_limit，与回复总数无关。
+        回复直接回复根评论时 reply_to_user_id 为空，回复其他回复时为被回复者ID
+        """
+        branches = []
+        for root_id in root_ids:
+            branch = select(
+                PromptComments.id,
+                PromptComments.user_id,
+                PromptComments.root_id,
+                PromptComments.parent_id,
+                PromptComments.content,
+                PromptComments.likes_count,
+                PromptComments.created_at,
+            ).where(
+                PromptComments.prompt_id == prompt_id,
+                PromptComments.root_id == root_id,
+                PromptComments.is_deleted == 0
+            ).order_by(PromptComments.created_at, PromptComments.id).limit(reply_limit).subquery()
+            # 包一层子查询，带 LIMIT 的分支才能参与 UNION ALL
+            branches.append(select(branch))
+        replies = union_all(*branches).subquery()
+
+        parent = aliased(PromptComments)
+        query = select(
+            replies,
+            parent.user_id.label("parent_user_id"),
+        ).outerjoin(
+            parent, parent.id == replies.c.parent_id
+        ).order_by(replies.c.root_id, replies.c.created_at, replies.c.id)
+
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def _get_reply_counts(self, prompt_id: int, root_ids: List[int]) -> Dict[int, int]:
+        """
+        统计每条根评论的回复总数
+
+        (prompt_id, root_id, is_deleted) 为 idx_prompt_root_created 的前缀，只扫描索引不回表
+        """
+        result = await self.db.execute(
+            select(PromptComments.root_id, func.count()).where(
+                PromptComments.prompt_id == prompt_id,
+                PromptComments.root_id.in_(root_ids),
+                PromptComments.is_deleted == 0
+            ).group_by(PromptComments.root_id)
+        )
+        return dict(result.all())
+
+    async def get_comments(self, prompt_id: int, cursor: str = "", page_size: int = 20, reply_limit: int = 3):
+        """
+        获取提示词的评论列表，根评论按时间倒序，每条附带最早的 reply_limit 条回复
+
+        Args:
+            prompt_id: 提示词ID
+            cursor: 上一页返回的游标，为空表示第一页
+            page_size: 每页根评论数量
+            reply_limit: 每条根评论附带的回复数量
+
+        Returns:
+            dict: 包含评论列表和下一页游标，没有更多数据时游标为None
+
+        Raises:
+            ValueError: 游标格式错误
+        """
+        last = decode_cursor(cursor, 2, (datetime, int))
+
+        query = select(PromptComments).where(
+            PromptComments.prompt_id == prompt_id,
+            PromptComments.root_id == 0,
+            PromptComments.is_deleted == 0
+        )
+
+        if last:
+            created_at, comment_id = last
+            query = query.where(or_(
+                PromptComments.created_at < created_at,
+                and_(PromptComments.created_at == created_at, PromptComments.id < comment_id)
+            ))
+
+        # 多取一条用于判断是否还有下一页
+        query = query.order_by(desc(PromptComments.created_at), desc(PromptComments.id)).limit(page_size + 1)
+        result = await self.db.execute(query)
+        roots = result.scalars().all()
+
+        next_cursor = None
+        if len(roots) > page_size:
+            roots = roots[:page_size]
+            next_cursor = encode_cursor((roots[-1].created_at, roots[-1].id))
+
+        replies, reply_counts = [], {}
+        if roots:
+            root_ids = [root.id for root in roots]
+            reply_counts = await self._get_reply_counts(prompt_id, root_ids)
+            # 没有回复的根评论不必再查
+            root_ids = [root_id for root_id in root_ids if reply_counts.get(root_id)]
+            if root_ids and reply_limit > 0:
+                replies = await self._get_top_replies(prompt_id, root_ids, reply_limit)
+
+        # 根评论、回复及被回复者的作者信息一次查询
+        user_ids = {root.user_id for root in roots}
+        for reply in replies:
+            user_ids.add(reply.user_id)
+            if reply.parent_id != reply.root_id and reply.parent_user_id:
+                user_ids.add(reply.parent_user_id)
+        users = await self.get_users(user_ids)
+
+        replies_by_root: Dict[int, list] = {}
+        for reply in replies:
+            reply_to_user_id = reply.parent_user_id if reply.parent_id != reply.root_id else None
+            replies_by_root.setdefault(reply.root_id, []).append(
+                self._format_comment(reply, users, reply_to_user_id)
+            )
+
+        items = []
+        for root in roots:
+            comment = self._format_comment(root, users)
+            comment["replies"] = replies_by_root.get(root.id, [])
+            comment["reply_count"] = reply_counts.get(root.id, 0)
+            items.append(comment)
+
+        return {
+            "items": items,
+            "next_cursor": next_cursor,
+        }
+
+    async def get_replies(self, prompt_id: int, root_id: int, cursor: str = "", page_size: int = 20):
+        """
+        获取根评论下的回复，按时间正序
+
+        Args:
+            prompt_id: 提示词ID
+            root_id: 根评论ID
+            cursor: 上一页返回的游标，为空表示第一页
+            page_size: 每页数量
+
+        Returns:
+            dict: 包含回复列表和下一页游标，没有更多数据时游标为None
+
+        Raises:
+            ValueError: 游标格式错误
+        """
+        last = decode_cursor(cursor, 2, (datetime, int))
+
+        parent = aliased(PromptComments)
+        query = select(
+            PromptComments,
+            parent.user_id.label("parent_user_id"),
+        ).outerjoin(
+            parent, parent.id == PromptComments.parent_id
+        ).where(
+            PromptComments.prompt_id == prompt_id,
+            PromptComments.root_id == root_id,
+            PromptComments.is_deleted == 0
+        )
+
+        if last:
+            created_at, comment_id = last
+            query = query.where(or_(
+                PromptComments.created_at > created_at,
+                and_(PromptComments.created_at == created_at, PromptComments.id > comment_id)
+            ))
+
+        query = query.order_by(PromptComments.created_at, PromptComments.id).limit(page_size + 1)
+        result = await self.db.execute(query)
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            tail = rows[-1][0]
+            next_cursor = encode_cursor((tail.created_at, tail.id))
+
+        user_ids = set()
+        for reply, parent_user_id in rows:
+            user_ids.add(reply.user_id)
+            if reply.parent_id != root_id and parent_user_id:
+                user_ids.add(parent_user_id)
+        users = await self.get_users(user_ids)
+
+        return {
+            "items": [
+                self._format_comment(reply, users, parent_user_id if reply.parent_id != root_id else None)
+                for reply, parent_user_id in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    async def add_comment(self, user_id: int, prompt_id: int, content: str, parent_id: int = 0) -> dict:
+        """
+        发表评论或回复
+
+        Args:
+            user_id: 评论者ID
+            prompt_id: 提示词ID
+            content: 评论内容
+            parent_id: 被回复的评论ID，0表示发表根评论
+
+        Returns:
+            dict: 新评论的ID
+
+        Raises:
+            ValueError: 内容为空或过长、提示词或被回复的评论不存在
+        """
+        content = content.strip()
+        if not content:
+            raise ValueError("评论内容不能为空")
+        if len(content) > self.MAX_CONTENT_LENGTH:
+            raise ValueError(f"评论内容不能超过{self.MAX_CONTENT_LENGTH}个字")
+
+        prompt_exists = await self.db.execute(
+            select(Prompts.id).where(
+                Prompts.id == prompt_id,
+                Prompts.status == 1,
+                Prompts.is_deleted == 0
+            )
+        )
+        if prompt_exists.scalar() is None:
+            raise ValueError("提示词不存在")
+
+        root_id = 0
+        if parent_id:
+            result = await self.db.execute(
+                select(PromptComments.id, PromptComments.root_id).where(
+                    PromptComments.id == parent_id,
+                    PromptComments.prompt_id == prompt_id,
+                    PromptComments.is_deleted == 0
+                )
+            )
+            parent = result.first()
+            if parent is None:
+                raise ValueError("回复的评论不存在")
+            # 回复根评论时其自身即为根，回复其他回复时沿用其根评论
+            root_id = parent.root_id or parent.id
+
+        comment = PromptComments(
+            user_id=user_id,
+            prompt_id=prompt_id,
+            root_id=root_id,
+            parent_id=parent_id,
+            content=content,
+        )
+        self.db.add(comment)
+        await self.db.commit()
+
+        return {"id": comment.id}
+
+    async def delete_comment(self, user_id: int, comment_id: int) -> None:
+        """
+        删除自己的评论
+
+        Raises:
+            ValueError: 评论不存在或不属于该用户
+        """
+        result = await self.db.execute(
+            select(PromptComments).where(
+                PromptComments.id == comment_id,
+                PromptComments.user_id == user_id,
+                PromptComments.is_deleted == 0
+            )
+        )
+        comment = result.scalar()
+        if comment is None:
+            raise ValueError("评论不存在")
+
+        comment.is_deleted = 1
+        await self.db.commit()
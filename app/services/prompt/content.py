@@ -1,7 +1,50 @@
-from sqlalchemy import select, update, insert, func
+from typing import Optional
+
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Prompts, Users, UserViewPrompts
+from app.core.responses import encode_content
+from app.models import Prompts, Users
+from app.services.prompt.feed import hot_feed
+from app.services.prompt.views import view_buffer
+from app.services.user.relation import relation_resolver
+from app.utils.cache import TTLCache
+from app.utils import codec
+
+
+class CachedContent:
+    """缓存的提示词内容
+
+    正文、图片等不随浏览者变化的字段预先编码为JSON字节（去掉结尾的 }），
+    计数和作者信息单独保存，每次请求只编码这部分小字段后拼接。
+    """
+
+    __slots__ = ("body", "counts", "author")
+
+    def __init__(self, payload: dict):
+        self.counts = payload.pop("counts")
+        self.author = payload.pop("author")
+        self.body = encode_content(payload)[:-1]
+
+    def render(self, extra: dict) -> bytes:
+        """拼接预编码字段和本次请求的字段，返回完整的JSON对象字节"""
+        return self.body + b"," + encode_content(extra)[1:]
+
+
+# 组装好的提示词内容缓存，key为提示词ID，不包含与浏览者相关的字段。
+# 修改或删除提示词时只清除本进程的缓存，其他 worker 最多在 ttl 秒内仍返回旧内容
+prompt_content_cache = TTLCache(maxsize=2048, ttl=60)
+
+
+def _apply_flushed_views(view_counts: dict) -> None:
+    """浏览量写回后同步到已缓存的内容，避免缓存中的浏览量回退"""
+    for prompt_id, count in view_counts.items():
+        cached = prompt_content_cache.peek(prompt_id)
+        if cached is not None:
+            cached.counts["view"] += count
+
+
+view_buffer.add_flush_listener(_apply_flushed_views)
 
 
 class PromptContentService:
@@ -10,15 +53,23 @@ class PromptContentService:
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
 
-    async def get_prompt_content(self, prompt_id: int, user_id: int = None) -> dict:
-        """获取提示词内容
+    @staticmethod
+    def invalidate_cache(prompt_id: int) -> None:
+        """提示词被修改或删除后清除其内容缓存
+
+        Args:
+            prompt_id: 提示词ID
+        """
+        prompt_content_cache.invalidate(prompt_id)
+
+    async def _load_prompt_content(self, prompt_id: int) -> dict:
+        """从数据库加载并组装提示词内容
 
         Args:
             prompt_id: 提示词ID
-            user_id: 用户ID，可选
 
         Returns:
-            dict: 提示词内容信息
+            dict: 提示词内容信息，不存在时返回空字典
         """
         # 查询提示词基本信息
         prompt_query = select(Prompts).where(
@@ -32,41 +83,6 @@ class PromptContentService:
         if not prompt:
             return {}
 
-        # 更新浏览量
-        update_query = update(Prompts).where(
-            Prompts.id == prompt_id
-        ).values(
-            view_count=Prompts.view_count + 1
-        )
-        await self.db.execute(update_query)
-
-        # 如果提供了用户ID，记录用户浏览记录
-        if user_id:
-            # 查询是否存在浏览记录
-            view_query = select(UserViewPrompts).where(
-                UserViewPrompts.user_id == user_id,
-                UserViewPrompts.prompt_id == prompt_id
-            )
-            view_result = await self.db.execute(view_query)
-            view_record = view_result.scalar_one_or_none()
-
-            if view_record:
-                # 更新浏览时间
-                update_view_query = update(UserViewPrompts).where(
-                    UserViewPrompts.user_id == user_id,
-                    UserViewPrompts.prompt_id == prompt_id
-                ).values(view_at=func.current_timestamp())
-                await self.db.execute(update_view_query)
-            else:
-                # 创建新的浏览记录
-                insert_view_query = insert(UserViewPrompts).values(
-                    user_id=user_id,
-                    prompt_id=prompt_id
-                )
-                await self.db.execute(insert_view_query)
-
-        await self.db.commit()
-
         # 查询作者信息
         user_query = select(Users).where(
             Users.id == prompt.user_id,
@@ -87,14 +103,14 @@ class PromptContentService:
             "id": prompt.id,
             "type": prompt.type,
 
-            "images": eval(prompt.images) if prompt.images else [],
+            "images": codec.loads(prompt.images, []),
             "title": prompt.title,
             "tags": tags,
-            "content": eval(prompt.content),
+            "content": codec.loads(prompt.content),
 
             "counts": {
                 "comment": prompt.comment_count,
-                "view": prompt.view_count + 1,
+                "view": prompt.view_count,
                 "like": prompt.like_count,
                 "favorite": prompt.favorite_count,
             },
@@ -104,13 +120,52 @@ class PromptContentService:
                 "nickname": user.nickname if user else None,
                 "avatar_url": user.avatar_url if user else None,
                 "bio": user.bio if user else None,
-                "relation": {
-                    "is_followed": False, # TODO
-                }
             },
 
-            "is_liked": False, # TODO
-            "is_favorited": False, # TODO
             "created_at": str(prompt.created_at),
             "updated_at": str(prompt.updated_at),
-        }
\ No newline at end of file
+        }
+
+    async def get_prompt_content(self, prompt_id: int, user_id: int = None) -> Optional[bytes]:
+        """获取提示词内容
+
+        Args:
+            prompt_id: 提示词ID
+            user_id: 用户ID，可选
+
+        Returns:
+            bytes: 编码好的提示词内容JSON对象，提示词不存在时返回None
+        """
+        cached = prompt_content_cache.get(prompt_id)
+        if cached is None:
+            payload = await self._load_prompt_content(prompt_id)
+            if not payload:
+                return None
+            cached = CachedContent(payload)
+            prompt_content_cache.set(prompt_id, cached)
+
+        # 记录浏览量和用户浏览记录，由后台任务批量写回
+        view_buffer.record(prompt_id, user_id)
+        hot_feed.bump(prompt_id)
+
+        # 浏览者的点赞、收藏、关注状态
+        author_id = cached.author["id"]
+        relations = await relation_resolver.resolve(
+            self.db, user_id, [prompt_id], [author_id] if author_id else []
+        )
+
+        # 在缓存内容之上叠加浏览量和与浏览者相关的字段
+        return cached.render({
+            "counts": {
+                **cached.counts,
+                "view": cached.counts["view"] + view_buffer.pending_views(prompt_id),
+            },
+            "author": {
+                **cached.author,
+                "relation": {
+                    "is_followed": author_id in relations["followed"],
+                }
+            },
+            "is_liked": prompt_id in relations["liked"],
+            "is_favorited": prompt_id in relations["favorited"],
+        })
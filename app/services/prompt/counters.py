@@ -0,0 +1,369 @@
+"""冗余计数维护
+
+Prompts.comment_count、like_count、favorite_count 和 PromptComments.likes_count 由两部分维护：
+
+- CounterPipeline：通过ORM写入 PromptComments、UserLikes、UserFavoritePrompts（新增、删除、
+  修改 is_deleted）时，会话在 flush 后计算计数增量，提交成功后交给流水线合并，
+  后台定时为每个计数列执行一条 CASE UPDATE，回滚的事务不产生增量。
+- CounterReconciler：作为独立维护任务定时运行（python -m app.services.prompt.counters），
+  按主键分批用 GROUP BY 重新统计，修正绕过ORM的批量写入或进程退出造成的偏差。
+
+丢失边界：进程异常退出时最多丢失一个刷新周期内的增量，由下一次对账修正。
+
+对账看不到各工作进程内尚未写回的增量，若把已提交但未写回的变化计入实际数量，增量写回后会重复计数。
+因此对账跳过最近 settle 秒内有点赞、收藏、评论活动的目标（settle 远大于写回间隔），
+并以读到的旧值为条件更新，读取后被写回修改过的行不会被覆盖。
+收藏、评论的取消只修改 is_deleted 而不更新时间，这类变化与对账恰好重叠时仍可能产生偏差，由下一次对账修正。
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, case, func, event, inspect, text
+
+from app.core.db import engine, SessionLocal, RoutingSession
+from app.models import Prompts, PromptComments, UserLikes, UserFavoritePrompts
+from app.utils.periodic import PeriodicTask
+
+# 计数名: 计数列
+COUNTER_COLUMNS = {
+    "prompt_comments": Prompts.comment_count,
+    "prompt_likes": Prompts.like_count,
+    "prompt_favorites": Prompts.favorite_count,
+    "comment_likes": PromptComments.likes_count,
+}
+
+CounterKey = Tuple[str, int]  # (计数名, 目标ID)
+
+# 写入会影响计数的模型
+TRACKED_MODELS = (PromptComments, UserLikes, UserFavoritePrompts)
+
+
+def _counter_key(obj) -> Optional[CounterKey]:
+    """获取一条记录影响的计数"""
+    if isinstance(obj, PromptComments):
+        return "prompt_comments", obj.prompt_id
+    if isinstance(obj, UserLikes):
+        return ("prompt_likes" if obj.target_type == "prompt" else "comment_likes"), obj.target_id
+    if isinstance(obj, UserFavoritePrompts):
+        return "prompt_favorites", obj.prompt_id
+    return None
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_deltas(session, flush_context):
+    # after_flush 时 new/dirty/deleted 及属性历史仍为 flush 前的状态
+    deltas: Dict[CounterKey, int] = session.info.setdefault("counter_deltas", {})
+
+    def add(obj, delta: int) -> None:
+        key = _counter_key(obj)
+        if key is not None and key[1]:
+            deltas[key] = deltas.get(key, 0) + delta
+
+    for obj in session.new:
+        if isinstance(obj, TRACKED_MODELS) and not obj.is_deleted:
+            add(obj, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, TRACKED_MODELS) and not obj.is_deleted:
+            add(obj, -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, TRACKED_MODELS):
+            continue
+        history = inspect(obj).attrs.is_deleted.history
+        if not history.has_changes():
+            continue
+        was_active = not (history.deleted[0] if history.deleted else 0)
+        is_active = not obj.is_deleted
+        if was_active != is_active:
+            add(obj, 1 if is_active else -1)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _publish_deltas(session):
+    deltas = session.info.pop("counter_deltas", None)
+    if deltas:
+        counter_pipeline.add(deltas)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_deltas(session):
+    session.info.pop("counter_deltas", None)
+
+
+class CounterPipeline(PeriodicTask):
+    """计数增量合并写回"""
+
+    def __init__(self, interval: float = 5):
+        """初始化计数流水线
+
+        Args:
+            interval: 刷新间隔（秒）
+        """
+        super().__init__(interval)
+        self._deltas: Dict[str, Dict[int, int]] = {}
+        self._metrics = {
+            "events": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "flushed_rows": 0,
+            "last_flush_at": None,
+            "last_flush_seconds": 0.0,
+        }
+
+    def add(self, deltas: Dict[CounterKey, int]) -> None:
+        """合并一次提交产生的计数增量"""
+        for (counter, target_id), delta in deltas.items():
+            if not delta:
+                continue
+            pending = self._deltas.setdefault(counter, {})
+            pending[target_id] = pending.get(target_id, 0) + delta
+            if not pending[target_id]:
+                del pending[target_id]
+            self._metrics["events"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """获取流水线统计信息"""
+        return {
+            **self._metrics,
+            "pending": sum(len(pending) for pending in self._deltas.values()),
+        }
+
+    async def run_once(self) -> None:
+        """每个计数列执行一条UPDATE写回合并后的增量"""
+        deltas, self._deltas = self._deltas, {}
+        deltas = {counter: pending for counter, pending in deltas.items() if pending}
+        if not deltas:
+            return
+
+        started = time.monotonic()
+        try:
+            async with SessionLocal() as session:
+                for counter, pending in deltas.items():
+                    column = COUNTER_COLUMNS[counter]
+                    model = column.class_
+                    await session.execute(
+                        update(model).where(
+                            model.id.in_(list(pending))
+                        ).values({
+                            column.key: func.greatest(
+                                func.coalesce(column, 0) + case(pending, value=model.id, else_=0), 0
+                            )
+                        })
+                    )
+                await session.commit()
+        except Exception:
+            # 写回失败时合并回流水线，等待下次重试
+            self._metrics["flush_errors"] += 1
+            for counter, pending in deltas.items():
+                self.add({(counter, target_id): delta for target_id, delta in pending.items()})
+            raise
+
+        self._metrics["flushes"] += 1
+        self._metrics["flushed_rows"] += sum(len(pending) for pending in deltas.values())
+        self._metrics["last_flush_at"] = str(datetime.now())
+        self._metrics["last_flush_seconds"] = time.monotonic() - started
+
+    async def on_stop(self) -> None:
+        await self.run_once()
+
+
+# 进程内共享的计数流水线
+counter_pipeline = CounterPipeline()
+
+
+class CounterReconciler:
+    """计数对账任务
+
+    按主键分批读取 prompts、prompt_comments 的计数，对本批ID用 GROUP BY 统计实际数量，
+    只更新有偏差且最近没有活动的行，批次之间暂停 pause 秒。
+    多个实例同时运行时通过 MySQL GET_LOCK 保证只有一个在执行。
+    """
+
+    LOCK_NAME = "lex:counter_reconcile"
+
+    def __init__(self, chunk_size: int = 1000, pause: float = 0.1, settle: int = 60):
+        """初始化对账任务
+
+        Args:
+            chunk_size: 每批检查的行数
+            pause: 批次之间的暂停时间（秒）
+            settle: 最近有活动的目标跳过对账的时间窗口（秒），需远大于计数写回间隔
+        """
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.settle = settle
+        self.last_result = {"checked": 0, "fixed": 0, "skipped": 0, "seconds": 0.0}
+
+    def _since(self):
+        """活动时间窗口的起点，使用数据库时间避免时钟偏差"""
+        return func.timestampadd(text("SECOND"), -self.settle, func.now())
+
+    @staticmethod
+    async def _group_count(session, key_column, ids: List[int], *conditions) -> Dict[int, int]:
+        result = await session.execute(
+            select(key_column, func.count()).where(
+                key_column.in_(ids), *conditions
+            ).group_by(key_column)
+        )
+        return dict(result.all())
+
+    @staticmethod
+    async def _active_ids(session, key_column, time_column, ids: List[int], since, *conditions) -> set:
+        """获取最近有活动的目标ID"""
+        result = await session.execute(
+            select(key_column).where(
+                key_column.in_(ids), time_column >= since, *conditions
+            ).distinct()
+        )
+        return set(result.scalars().all())
+
+    async def _fix(self, session, counter: str, stored: Dict[int, int], actual: Dict[int, int], active: set) -> Tuple[int, int]:
+        """更新与实际数量不一致的计数，返回 (修正行数, 跳过行数)"""
+        drift = {
+            target_id: actual.get(target_id, 0)
+            for target_id, value in stored.items()
+            if (value or 0) != actual.get(target_id, 0)
+        }
+        skipped = len(drift.keys() & active)
+        for target_id in active:
+            drift.pop(target_id, None)
+        if not drift:
+            return 0, skipped
+
+        column = COUNTER_COLUMNS[counter]
+        model = column.class_
+        expected = {target_id: stored[target_id] or 0 for target_id in drift}
+        result = await session.execute(
+            update(model).where(
+                model.id.in_(list(drift)),
+                # 读取后被增量写回修改过的行保持不变
+                func.coalesce(column, 0) == case(expected, value=model.id)
+            ).values({column.key: case(drift, value=model.id, else_=column)})
+        )
+        return result.rowcount, skipped + len(drift) - result.rowcount
+
+    async def _reconcile_prompts(self, session, last_id: int) -> Tuple[int, int, int, int]:
+        """检查一批提示词，返回 (本批最后ID, 检查行数, 修正行数, 跳过行数)"""
+        rows = (await session.execute(
+            select(Prompts.id, Prompts.comment_count, Prompts.like_count, Prompts.favorite_count).where(
+                Prompts.id > last_id
+            ).order_by(Prompts.id).limit(self.chunk_size)
+        )).all()
+        if not rows:
+            return last_id, 0, 0, 0
+
+        ids = [row.id for row in rows]
+        since = self._since()
+        prompt_likes = UserLikes.target_type == "prompt"
+        comments = await self._group_count(session, PromptComments.prompt_id, ids, PromptComments.is_deleted == 0)
+        likes = await self._group_count(
+            session, UserLikes.target_id, ids, prompt_likes, func.coalesce(UserLikes.is_deleted, 0) == 0
+        )
+        favorites = await self._group_count(
+            session, UserFavoritePrompts.prompt_id, ids, func.coalesce(UserFavoritePrompts.is_deleted, 0) == 0
+        )
+
+        results = [
+            await self._fix(
+                session, "prompt_comments", {row.id: row.comment_count for row in rows}, comments,
+                await self._active_ids(session, PromptComments.prompt_id, PromptComments.created_at, ids, since)
+            ),
+            await self._fix(
+                session, "prompt_likes", {row.id: row.like_count for row in rows}, likes,
+                await self._active_ids(session, UserLikes.target_id, UserLikes.updated_at, ids, since, prompt_likes)
+            ),
+            await self._fix(
+                session, "prompt_favorites", {row.id: row.favorite_count for row in rows}, favorites,
+                await self._active_ids(session, UserFavoritePrompts.prompt_id, UserFavoritePrompts.created_at, ids, since)
+            ),
+        ]
+        return ids[-1], len(rows), sum(fixed for fixed, _ in results), sum(skipped for _, skipped in results)
+
+    async def _reconcile_comments(self, session, last_id: int) -> Tuple[int, int, int, int]:
+        """检查一批评论的点赞数，返回 (本批最后ID, 检查行数, 修正行数, 跳过行数)"""
+        rows = (await session.execute(
+            select(PromptComments.id, PromptComments.likes_count).where(
+                PromptComments.id > last_id
+            ).order_by(PromptComments.id).limit(self.chunk_size)
+        )).all()
+        if not rows:
+            return last_id, 0, 0, 0
+
+        ids = [row.id for row in rows]
+        comment_likes = UserLikes.target_type == "comment"
+        likes = await self._group_count(
+            session, UserLikes.target_id, ids, comment_likes, func.coalesce(UserLikes.is_deleted, 0) == 0
+        )
+        active = await self._active_ids(session, UserLikes.target_id, UserLikes.updated_at, ids, self._since(), comment_likes)
+        fixed, skipped = await self._fix(session, "comment_likes", {row.id: row.likes_count for row in rows}, likes, active)
+        return ids[-1], len(rows), fixed, skipped
+
+    async def run_once(self) -> Optional[dict]:
+        """执行一次对账
+
+        Returns:
+            dict: 检查行数、修正行数、跳过行数和耗时，已有其他实例在执行时返回None
+        """
+        async with engine.connect() as lock_conn:
+            locked = (await lock_conn.execute(
+                text("SELECT GET_LOCK(:name, 0)"), {"name": self.LOCK_NAME}
+            )).scalar()
+            if not locked:
+                print("\033[93m-计数对账已在其他进程执行，跳过本次\033[0m")
+                return None
+
+            try:
+                return await self._run()
+            finally:
+                await lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": self.LOCK_NAME})
+
+    async def _run(self) -> dict:
+        started = time.monotonic()
+        checked = fixed = skipped = 0
+
+        for reconcile in (self._reconcile_prompts, self._reconcile_comments):
+            last_id = 0
+            while True:
+                async with SessionLocal() as session:
+                    last_id, rows, rows_fixed, rows_skipped = await reconcile(session, last_id)
+                    await session.commit()
+                checked += rows
+                fixed += rows_fixed
+                skipped += rows_skipped
+                if rows < self.chunk_size:
+                    break
+                await asyncio.sleep(self.pause)
+
+        self.last_result = {"checked": checked, "fixed": fixed, "skipped": skipped, "seconds": time.monotonic() - started}
+        if fixed:
+            print(f"\033[93m-计数对账修正 {fixed} 行，检查 {checked} 行\033[0m")
+        return self.last_result
+
+
+if __name__ == "__main__":
+    # 作为独立维护任务运行，由 cron 等外部调度，每小时一次即可:
+    # python -m app.services.prompt.counters [--chunk-size 1000] [--pause 0.1] [--settle 60]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="重新统计提示词和评论的冗余计数")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="每批检查的行数")
+    parser.add_argument("--pause", type=float, default=0.1, help="批次之间的暂停时间（秒）")
+    parser.add_argument("--settle", type=int, default=60, help="最近有活动的目标跳过对账的时间窗口（秒）")
+    args = parser.parse_args()
+
+    async def main():
+        try:
+            result = await CounterReconciler(args.chunk_size, args.pause, args.settle).run_once()
+            if result is not None:
+                print(
+                    f"检查 {result['checked']} 行，修正 {result['fixed']} 行，"
+                    f"跳过 {result['skipped']} 行，耗时 {result['seconds']:.2f} 秒"
+                )
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+"""热门推荐流
+
+在进程内维护按 (view_count, created_at, id) 倒序排列的推荐流（全局及每个公开标签），
+后台定时全量重建，两次重建之间通过 bump 增量调整排名，
+使推荐接口只需切片一页数据并批量查询作者信息，无需每次对 prompts 全表排序。
+"""
+
+from bisect import bisect_right, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, desc
+
+from app.core.db import SessionLocal
+from app.models import Prompts, PromptTagPublic, PromptTagRelation
+from app.utils.periodic import PeriodicTask
+
+FeedKey = Tuple[int, float, int]
+
+
+class FeedEntry:
+    """推荐流中的提示词摘要"""
+
+    __slots__ = (
+        "id", "user_id", "type", "cover_image", "title", "summary_content",
+        "like_count", "view_count", "created_at", "tag_ids",
+    )
+
+    def __init__(self, row, tag_ids=()):
+        self.id = row.id
+        self.user_id = row.user_id
+        self.type = row.type
+        self.cover_image = row.cover_image
+        self.title = row.title
+        self.summary_content = row.summary_content
+        self.like_count = row.like_count or 0
+        self.view_count = row.view_count or 0
+        self.created_at = row.created_at
+        self.tag_ids = set(tag_ids)
+
+    @property
+    def key(self) -> FeedKey:
+        return feed_key(self.view_count, self.created_at, self.id)
+
+
+def feed_key(view_count: int, created_at: Optional[datetime], prompt_id: int) -> FeedKey:
+    """生成升序排列即为推荐顺序的排序键"""
+    created_ts = created_at.timestamp() if created_at else float("-inf")
+    return (-(view_count or 0), -created_ts, -prompt_id)
+
+
+class HotFeed(PeriodicTask):
+    """热门推荐流物化视图"""
+
+    _COLUMNS = (
+        Prompts.id, Prompts.user_id, Prompts.type, Prompts.cover_image, Prompts.title,
+        Prompts.summary_content, Prompts.like_count, Prompts.view_count, Prompts.created_at,
+    )
+
+    def __init__(self, interval: float = 60, max_size: int = 5000, tag_max_size: int = 1000):
+        """初始化推荐流
+
+        Args:
+            interval: 全量重建间隔（秒）
+            max_size: 全局推荐流最多物化的条数
+            tag_max_size: 每个公开标签推荐流最多物化的条数
+        """
+        super().__init__(interval)
+        self.max_size = max_size
+        self.tag_max_size = tag_max_size
+        self._entries: Dict[int, FeedEntry] = {}
+        self._feeds: Dict[int, List[FeedKey]] = {}  # 0 为全局推荐流
+        self._truncated: Dict[int, bool] = {}
+        self.ready = False
+
+    def _base_query(self):
+        return select(*self._COLUMNS).where(
+            Prompts.status == 1,
+            Prompts.is_deleted == 0
+        ).order_by(desc(Prompts.view_count), desc(Prompts.created_at), desc(Prompts.id))
+
+    async def run_once(self) -> None:
+        """全量重建推荐流，构建完成后整体替换"""
+        entries: Dict[int, FeedEntry] = {}
+        feeds: Dict[int, List[FeedKey]] = {}
+        truncated: Dict[int, bool] = {}
+
+        async with SessionLocal() as session:
+            rows = (await session.execute(self._base_query().limit(self.max_size))).all()
+            for row in rows:
+                entries[row.id] = FeedEntry(row)
+            feeds[0] = [entries[row.id].key for row in rows]
+            truncated[0] = len(rows) >= self.max_size
+
+            tag_ids = (await session.execute(
+                select(PromptTagPublic.real_tag_id).where(PromptTagPublic.status == 1)
+            )).scalars().all()
+
+            for tag_id in tag_ids:
+                query = self._base_query().join(
+                    PromptTagRelation,
+                    (PromptTagRelation.prompt_id == Prompts.id) & (PromptTagRelation.tag_id == tag_id)
+                ).limit(self.tag_max_size)
+                rows = (await session.execute(query)).all()
+                for row in rows:
+                    entry = entries.get(row.id)
+                    if entry is None:
+                        entry = entries[row.id] = FeedEntry(row)
+                    entry.tag_ids.add(tag_id)
+                feeds[tag_id] = [entries[row.id].key for row in rows]
+                truncated[tag_id] = len(rows) >= self.tag_max_size
+
+        self._entries, self._feeds, self._truncated = entries, feeds, truncated
+        self.ready = True
+
+    def bump(self, prompt_id: int, views: int = 1) -> None:
+        """增量调整提示词浏览量并更新其在各推荐流中的位置
+
+        Args:
+            prompt_id: 提示词ID
+            views: 增加的浏览量
+        """
+        entry = self._entries.get(prompt_id)
+        if entry is None:
+            return
+
+        old_key = entry.key
+        entry.view_count += views
+        new_key = entry.key
+
+        for feed_id in (0, *entry.tag_ids):
+            feed = self._feeds.get(feed_id)
+            if feed is None:
+                continue
+            index = bisect_right(feed, old_key) - 1
+            if index >= 0 and feed[index] == old_key:
+                del feed[index]
+                insort(feed, new_key)
+
+    def get_page(self, tag_id: int, after: Optional[list], offset: int, page_size: int) -> Optional[Tuple[List[FeedEntry], bool]]:
+        """从推荐流中切片一页数据
+
+        Args:
+            tag_id: 标签ID，0表示全部
+            after: 游标解析出的 (view_count, created_at, id)，None表示从offset开始
+            offset: 偏移量，仅在after为None时使用
+            page_size: 每页数量
+
+        Returns:
+            Optional[Tuple]: (提示词摘要列表, 是否还有下一页)，
+            推荐流未就绪或请求超出物化范围时返回None，由调用方回退到数据库查询
+        """
+        feed = self._feeds.get(tag_id) if self.ready else None
+        if feed is None:
+            return None
+
+        start = bisect_right(feed, feed_key(*after)) if after else offset
+        end = start + page_size
+        truncated = self._truncated.get(tag_id, False)
+
+        # 物化范围不足以判断本页和下一页时回退
+        if truncated and end >= len(feed):
+            return None
+
+        keys = feed[start:end]
+        return [self._entries[-key[2]] for key in keys], end < len(feed)
+
+
+# 进程内共享的热门推荐流
+hot_feed = HotFeed()
@@ -0,0 +1,85 @@
+"""热门搜索关键词排行榜
+
+搜索请求实时喂入内存中的 Space-Saving 统计，排行榜直接从内存返回；
+后台任务定时先写入缓冲的搜索记录，再以 prompt_search_records 中的 search_count 为准重建统计，
+并同步被隐藏（status=2）的关键词。
+"""
+
+import time
+from typing import List, Set
+
+from sqlalchemy import select, desc
+
+from app.core.db import SessionLocal
+from app.models import PromptSearchRecords
+from app.services.prompt.search import search_record_buffer
+from app.utils.periodic import PeriodicTask
+from app.utils.topk import SpaceSaving
+
+
+class HotKeywordBoard(PeriodicTask):
+    """热门搜索关键词排行榜"""
+
+    def __init__(self, interval: float = 60, capacity: int = 1000, refresh_seconds: float = 1):
+        """初始化排行榜
+
+        Args:
+            interval: 与数据库对账的间隔（秒）
+            capacity: 内存中跟踪的关键词数
+            refresh_seconds: 排行榜快照的最短刷新间隔（秒）
+        """
+        super().__init__(interval)
+        self.capacity = capacity
+        self.refresh_seconds = refresh_seconds
+        self._sketch = SpaceSaving(capacity)
+        self._hidden: Set[str] = set()
+        self._snapshot: List[dict] = []
+        self._snapshot_at = 0.0
+
+    def add(self, keyword: str) -> None:
+        """记录一次搜索"""
+        if keyword not in self._hidden:
+            self._sketch.add(keyword)
+
+    def top(self, k: int = 10) -> List[dict]:
+        """获取排行榜前k名
+
+        Returns:
+            List[dict]: [{"keyword": 关键词, "count": 搜索次数}]
+        """
+        now = time.monotonic()
+        if len(self._snapshot) < k or now - self._snapshot_at > self.refresh_seconds:
+            self._snapshot = [
+                {"keyword": keyword, "count": count}
+                for keyword, count in self._sketch.top(max(k, len(self._snapshot)))
+            ]
+            self._snapshot_at = now
+        return self._snapshot[:k]
+
+    async def run_once(self) -> None:
+        """写入缓冲的搜索记录后，按数据库中的计数重建统计"""
+        await search_record_buffer.run_once()
+
+        async with SessionLocal() as session:
+            hidden = (await session.execute(
+                select(PromptSearchRecords.keyword).where(PromptSearchRecords.status == 2)
+            )).scalars().all()
+            rows = (await session.execute(
+                select(PromptSearchRecords.keyword, PromptSearchRecords.search_count)
+                .where(PromptSearchRecords.status == 1)
+                .order_by(desc(PromptSearchRecords.search_count))
+                .limit(self.capacity)
+            )).all()
+
+        sketch = SpaceSaving(self.capacity)
+        for row in rows:
+            sketch.add(row.keyword, row.search_count or 0)
+
+        self._hidden = set(hidden)
+        self._sketch = sketch
+        self._snapshot_at = 0.0
+
+
+# 进程内共享的热门关键词排行榜
+hot_keyword_board = HotKeywordBoard()
+search_record_buffer.add_record_listener(hot_keyword_board.add)
@@ -0,0 +1,82 @@
+"""提示词存储格式迁移
+
+将 prompts 表中以Python字面量存储的 content、images 改写为JSON格式，按主键分批处理。
+
+用法:
+    python -m app.services.prompt.migrate [--chunk-size 500] [--dry-run]
+"""
+
+import argparse
+import asyncio
+from typing import Dict
+
+from sqlalchemy import select, update
+
+from app.core.db import SessionLocal, engine
+from app.models import Prompts
+from app.utils import codec
+
+
+async def migrate_prompt_codec(chunk_size: int = 500, dry_run: bool = False) -> Dict[str, int]:
+    """将旧格式的提示词内容改写为JSON
+
+    Args:
+        chunk_size: 每批处理的行数
+        dry_run: 只统计不写入
+
+    Returns:
+        Dict: 扫描、改写、解析失败的行数
+    """
+    result = {"scanned": 0, "migrated": 0, "failed": 0}
+    last_id = 0
+
+    async with SessionLocal() as session:
+        while True:
+            rows = (await session.execute(
+                select(Prompts.id, Prompts.content, Prompts.images)
+                .where(Prompts.id > last_id)
+                .order_by(Prompts.id)
+                .limit(chunk_size)
+            )).all()
+            if not rows:
+                break
+
+            for row in rows:
+                result["scanned"] += 1
+                values = {}
+                try:
+                    for field in ("content", "images"):
+                        text = getattr(row, field)
+                        if text and not codec.is_json(text):
+                            values[field] = codec.dumps(codec.loads_legacy(text))
+                except ValueError:
+                    result["failed"] += 1
+                    print(f"提示词 {row.id} 无法解析，已跳过")
+                    continue
+
+                if values:
+                    result["migrated"] += 1
+                    if not dry_run:
+                        await session.execute(update(Prompts).where(Prompts.id == row.id).values(**values))
+
+            if not dry_run:
+                await session.commit()
+            last_id = rows[-1].id
+
+    return result
+
+
+async def main(chunk_size: int, dry_run: bool) -> None:
+    try:
+        result = await migrate_prompt_codec(chunk_size, dry_run)
+        print(f"扫描 {result['scanned']} 行，改写 {result['migrated']} 行，失败 {result['failed']} 行")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="将提示词内容迁移为JSON格式")
+    parser.add_argument("--chunk-size", type=int, default=500, help="每批处理的行数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计不写入")
+    args = parser.parse_args()
+    asyncio.run(main(args.chunk_size, args.dry_run))
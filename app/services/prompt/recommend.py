@@ -1,8 +1,13 @@
-from sqlalchemy import select, desc, func
+from datetime import datetime
+
+from sqlalchemy import select, desc, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.models import Prompts, Users, PromptTagPublic, PromptTagRelation
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.services.prompt.feed import hot_feed
+from app.services.user.relation import relation_resolver
 
 
 class PromptRecommendService:
@@ -32,45 +37,59 @@ class PromptRecommendService:
         user_result = await self.db.execute(user_query)
         return {user.id: user for user in user_result.scalars().all()}
 
-    async def get_recommend_prompts(self, page: int = 1, page_size: int = 15, tag_id: int = 0):
+    def _build_feed_query(self, tag_id: int = 0):
         """
-        获取推荐的提示词列表
+        构建推荐流基础查询，按浏览量、创建时间、ID倒序
 
         Args:
-            db: 数据库会话
-            page: 页码
-            page_size: 每页数量
-            tag_id: 标签ID
-
-        Returns:
-            dict: 包含提示词列表和分页信息
+            tag_id: 标签ID，0表示全部
         """
-        # 计算偏移量
-        offset = (page - 1) * page_size
-
-        # 构建基础查询
         query = select(Prompts).where(
             Prompts.status == 1,
             Prompts.is_deleted == 0
         )
 
         if tag_id != 0:
-            # 按标签过滤，并按浏览量和创建时间排序
+            # 按标签过滤
             query = query.join(
                 PromptTagRelation,
                 (PromptTagRelation.prompt_id == Prompts.id) & (PromptTagRelation.tag_id == tag_id)
-            ).order_by(desc(Prompts.view_count), desc(Prompts.created_at)).offset(offset).limit(page_size)
-        else:
-            # 按浏览量和创建时间排序
-            query = query.order_by(desc(Prompts.view_count), desc(Prompts.created_at)).offset(offset).limit(page_size)
+            )
 
-        result = await self.db.execute(query)
-        prompts = result.scalars().all()
+        return query.order_by(desc(Prompts.view_count), desc(Prompts.created_at), desc(Prompts.id))
+
+    @staticmethod
+    def _after_created_at(created_at, prompt_id: int):
+        """
+        浏览量相同时排在 (created_at, id) 之后的条件
 
+        created_at 倒序时 NULL 排在最后（与 feed_key 中的 -inf 一致），
+        不能直接比较 created_at < NULL，否则遇到 created_at 为空的记录后无法继续翻页
+        """
+        if created_at is None:
+            return and_(Prompts.created_at.is_(None), Prompts.id < prompt_id)
+        return or_(
+            Prompts.created_at < created_at,
+            Prompts.created_at.is_(None),
+            and_(Prompts.created_at == created_at, Prompts.id < prompt_id)
+        )
+
+    async def format_prompts(self, prompts: list, viewer_id: int = None) -> list:
+        """
+        将提示词列表转换为字典列表，包含提示词信息、用户信息和浏览者的点赞、收藏、关注状态
+
+        Args:
+            prompts: 提示词列表
+            viewer_id: 浏览者ID，可选
+        """
         # 获取提示词关联的用户信息
         users = await self.get_post_userinfo(prompts)
 
-        # 转换为字典列表，包含提示词信息和用户信息
+        # 整页提示词的浏览者关系，每种关系最多一次查询
+        relations = await relation_resolver.resolve(
+            self.db, viewer_id, [prompt.id for prompt in prompts], [prompt.user_id for prompt in prompts]
+        )
+
         prompt_list = []
         for prompt in prompts:
             user = users.get(prompt.user_id)
@@ -89,8 +108,97 @@ class PromptRecommendService:
                     "id": prompt.user_id,
                     "nickname": user.nickname if user else None,
                     "avatar_url": user.avatar_url if user else None,
+                    "relation": {
+                        "is_followed": prompt.user_id in relations["followed"],
+                    },
                 },
+                "is_liked": prompt.id in relations["liked"],
+                "is_favorited": prompt.id in relations["favorited"],
             }
             prompt_list.append(prompt_dict)
 
-        return prompt_list
\ No newline at end of file
+        return prompt_list
+
+    async def get_recommend_prompts(self, page: int = 1, page_size: int = 15, tag_id: int = 0, viewer_id: int = None):
+        """
+        获取推荐的提示词列表
+
+        Args:
+            db: 数据库会话
+            page: 页码
+            page_size: 每页数量
+            tag_id: 标签ID
+            viewer_id: 浏览者ID，可选
+
+        Returns:
+            dict: 包含提示词列表和分页信息
+        """
+        # 计算偏移量
+        offset = (page - 1) * page_size
+
+        # 优先从热门推荐流中切片
+        cached = hot_feed.get_page(tag_id, None, offset, page_size)
+        if cached is not None:
+            return await self.format_prompts(cached[0], viewer_id)
+
+        query = self._build_feed_query(tag_id).offset(offset).limit(page_size)
+
+        result = await self.db.execute(query)
+        prompts = result.scalars().all()
+
+        return await self.format_prompts(prompts, viewer_id)
+
+    async def get_recommend_prompts_by_cursor(self, cursor: str = "", page_size: int = 15, tag_id: int = 0, viewer_id: int = None):
+        """
+        使用游标获取推荐的提示词列表
+
+        游标记录上一页最后一条的 (view_count, created_at, id)，查询时直接定位到其之后，
+        不会随页数增加扫描并丢弃前面的记录，翻页过程中浏览量变化也不会导致重复或遗漏。
+
+        Args:
+            cursor: 上一页返回的游标，为空表示第一页
+            page_size: 每页数量
+            tag_id: 标签ID
+            viewer_id: 浏览者ID，可选
+
+        Returns:
+            dict: 包含提示词列表和下一页游标，没有更多数据时游标为None
+
+        Raises:
+            ValueError: 游标格式错误
+        """
+        last = decode_cursor(cursor, 3, (int, (datetime, type(None)), int))
+
+        # 优先从热门推荐流中切片
+        cached = hot_feed.get_page(tag_id, last, 0, page_size)
+        if cached is not None:
+            prompts, has_more = cached
+            tail = prompts[-1] if prompts else None
+            return {
+                "items": await self.format_prompts(prompts, viewer_id),
+                "next_cursor": encode_cursor((tail.view_count, tail.created_at, tail.id)) if has_more and tail else None,
+            }
+
+        query = self._build_feed_query(tag_id)
+
+        if last:
+            view_count, created_at, prompt_id = last
+            query = query.where(or_(
+                Prompts.view_count < view_count,
+                and_(Prompts.view_count == view_count, self._after_created_at(created_at, prompt_id))
+            ))
+
+        # 多取一条用于判断是否还有下一页
+        result = await self.db.execute(query.limit(page_size + 1))
+        prompts = result.scalars().all()
+
+        next_cursor = None
+        if len(prompts) > page_size:
+            prompts = prompts[:page_size]
+            tail = prompts[-1]
+            next_cursor = encode_cursor((tail.view_count, tail.created_at, tail.id))
+
+        return {
+            "items": await self.format_prompts(prompts, viewer_id),
+            "next_cursor": next_cursor,
+        }
@@ -0,0 +1,180 @@
+"""提示词搜索服务
+
+基于 prompts 表的 ft_content_search 全文索引（ngram分词）检索提示词，
+按相关度并结合浏览量、点赞数排序，搜索关键词由后台任务批量写入 prompt_search_records。
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, desc, func, or_, and_
+from sqlalchemy.dialects.mysql import insert, match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import SessionLocal
+from app.models import Prompts, PromptSearchRecords
+from app.services.prompt.recommend import PromptRecommendService
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.periodic import PeriodicTask
+
+# 关键词最大长度，与 prompt_search_records.keyword 一致
+KEYWORD_MAX_LENGTH = 50
+
+
+def normalize_keyword(keyword: str) -> str:
+    """规范化搜索关键词，合并空白并转为小写"""
+    return " ".join(keyword.split()).lower()[:KEYWORD_MAX_LENGTH]
+
+
+class SearchRecordBuffer(PeriodicTask):
+    """搜索关键词记录缓冲，按关键词合并搜索次数后定时批量写入"""
+
+    def __init__(self, interval: float = 10, max_pending: int = 10000, chunk_size: int = 1000):
+        """初始化关键词缓冲
+
+        Args:
+            interval: 写入间隔（秒）
+            max_pending: 最多缓冲的不同关键词数，超过后丢弃新关键词
+            chunk_size: 每条写入语句最多包含的关键词数
+        """
+        super().__init__(interval)
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self._counts: Dict[str, int] = {}
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_record_listener(self, listener: Callable[[str], None]) -> None:
+        """注册每次搜索时的回调，参数为规范化后的关键词"""
+        self._listeners.append(listener)
+
+    def record(self, keyword: str) -> None:
+        """记录一次搜索"""
+        self._merge(keyword, 1)
+        for listener in self._listeners:
+            listener(keyword)
+
+    def _merge(self, keyword: str, count: int) -> None:
+        if keyword in self._counts or len(self._counts) < self.max_pending:
+            self._counts[keyword] = self._counts.get(keyword, 0) + count
+
+    async def run_once(self) -> None:
+        """批量写入搜索次数，依赖 keyword 唯一键，新关键词插入、已有关键词累加次数"""
+        if not self._counts:
+            return
+
+        counts, self._counts = self._counts, {}
+        # 按关键词排序，多个进程同时写入时以相同顺序加锁
+        items = sorted(counts.items())
+        written = 0
+        try:
+            async with SessionLocal() as session:
+                for start in range(0, len(items), self.chunk_size):
+                    chunk = items[start:start + self.chunk_size]
+                    stmt = insert(PromptSearchRecords).values([
+                        {"keyword": keyword, "search_count": count}
+                        for keyword, count in chunk
+                    ])
+                    await session.execute(stmt.on_duplicate_key_update(
+                        search_count=PromptSearchRecords.search_count + stmt.inserted.search_count,
+                        updated_at=func.now(),
+                    ))
+                    await session.commit()
+                    written += len(chunk)
+        except Exception:
+            # 未写入的关键词合并回缓冲
+            for keyword, count in items[written:]:
+                self._merge(keyword, count)
+            raise
+
+    async def on_stop(self) -> None:
+        await self.run_once()
+
+
+# 进程内共享的搜索关键词缓冲
+search_record_buffer = SearchRecordBuffer()
+
+
+class PromptSearchService:
+    """提示词搜索服务"""
+
+    # 排序权重：相关度为主，浏览量和点赞数取对数后作为加分项
+    RELEVANCE_WEIGHT = 1.0
+    VIEW_WEIGHT = 0.1
+    LIKE_WEIGHT = 0.2
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    def _score(self, relevance):
+        return (
+            relevance * self.RELEVANCE_WEIGHT
+            + func.log(1 + func.coalesce(Prompts.view_count, 0)) * self.VIEW_WEIGHT
+            + func.log(1 + func.coalesce(Prompts.like_count, 0)) * self.LIKE_WEIGHT
+        )
+
+    async def search_prompts(
+        self, keyword: str, page: int = 1, page_size: int = 10, cursor: Optional[str] = None, viewer_id: int = None
+    ) -> dict:
+        """搜索提示词
+
+        Args:
+            keyword: 搜索关键词
+            page: 页码，传入cursor时忽略
+            page_size: 每页数量
+            cursor: 上一页返回的游标，空字符串表示第一页
+            viewer_id: 浏览者ID，可选
+
+        Returns:
+            dict: 包含提示词列表和下一页游标
+
+        Raises:
+            ValueError: 关键词为空或游标格式错误
+        """
+        keyword = normalize_keyword(keyword)
+        if not keyword:
+            raise ValueError("搜索关键词不能为空")
+
+        last = decode_cursor(cursor, 2, ((int, float), int)) if cursor is not None else None
+
+        relevance = match(
+            Prompts.title, Prompts.summary_content, Prompts.content,
+            against=keyword,
+        ).in_natural_language_mode()
+
+        ranked = select(
+            Prompts.id.label("id"),
+            self._score(relevance).label("score"),
+        ).where(
+            relevance > 0,
+            Prompts.status == 1,
+            Prompts.is_deleted == 0
+        ).subquery()
+
+        query = select(ranked.c.id, ranked.c.score).order_by(desc(ranked.c.score), desc(ranked.c.id))
+        if last:
+            score, prompt_id = last
+            query = query.where(or_(
+                ranked.c.score < score,
+                and_(ranked.c.score == score, ranked.c.id < prompt_id)
+            ))
+        elif cursor is None:
+            query = query.offset((page - 1) * page_size)
+
+        # 多取一条用于判断是否还有下一页
+        rows = (await self.db.execute(query.limit(page_size + 1))).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        # 只在第一页记录搜索关键词
+        if page == 1 and not last:
+            search_record_buffer.record(keyword)
+
+        prompts = []
+        if rows:
+            result = await self.db.execute(select(Prompts).where(Prompts.id.in_([row.id for row in rows])))
+            prompt_map = {prompt.id: prompt for prompt in result.scalars().all()}
+            prompts = [prompt_map[row.id] for row in rows if row.id in prompt_map]
+
+        return {
+            "items": await PromptRecommendService(self.db).format_prompts(prompts, viewer_id),
+            "next_cursor": encode_cursor((float(rows[-1].score), rows[-1].id)) if has_more else None,
+        }
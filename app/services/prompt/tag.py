@@ -1,7 +1,15 @@
+import asyncio
+import hashlib
+from typing import Optional, Tuple
+
 from sqlalchemy import select, desc, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db import SessionLocal
+from app.core.responses import encode_content
 from app.models import PromptTagPublic, PromptTag
+from app.services.prompt.tagindex import tag_index
+from app.utils.periodic import PeriodicTask
 
 
 class PromptTagService:
@@ -56,6 +64,11 @@ class PromptTagService:
         Returns:
             dict: 包含标签列表和分页信息
         """
+        # 优先使用内存索引，未就绪时查询数据库
+        result = tag_index.search(keyword, page, page_size)
+        if result is not None:
+            return result
+
         # 计算偏移量
         offset = (page - 1) * page_size
 
@@ -103,4 +116,61 @@ class PromptTagService:
             "page": page,
             "page_size": page_size,
             "pages": pages
-        }
\ No newline at end of file
+        }
+
+
+class PublicTagSnapshot(PeriodicTask):
+    """公开标签列表快照
+
+    公开标签很少变动，进程内保存已编码好的完整响应体和对应的 ETag，
+    首页请求直接返回字节，不再查询数据库和序列化。后台按 interval 定时刷新，
+    运营修改标签后调用 invalidate，下一次请求会立即重新加载。
+    """
+
+    def __init__(self, interval: float = 30):
+        """初始化快照
+
+        Args:
+            interval: 定时刷新间隔（秒）
+        """
+        super().__init__(interval)
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self._stale = True
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def refresh(self) -> None:
+        """从数据库重新加载公开标签列表并编码"""
+        async with SessionLocal() as session:
+            session.info["read_only"] = True
+            tag_list = await PromptTagService(session).get_public_tag_list()
+
+        body = encode_content({"code": 200, "msg": "成功", "data": tag_list})
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.body = body
+        self._stale = False
+
+    async def run_once(self) -> None:
+        await self.refresh()
+
+    def invalidate(self) -> None:
+        """标记快照失效，下一次读取时重新加载"""
+        self._stale = True
+
+    async def get(self) -> Tuple[bytes, str]:
+        """获取快照
+
+        Returns:
+            Tuple[bytes, str]: (响应体, ETag)
+        """
+        if self._stale or self.body is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                # 等待锁期间可能已被其他请求刷新
+                if self._stale or self.body is None:
+                    await self.refresh()
+        return self.body, self.etag
+
+
+public_tag_snapshot = PublicTagSnapshot()
@@ -0,0 +1,173 @@
+"""标签自动补全索引
+
+在进程内维护启用标签名称的二元组（bigram）倒排索引，支持中英文子串匹配，
+结果按 (click_count, created_at) 倒序排列，使标签选择器的每次输入无需对 prompt_tag 做 LIKE 全表扫描和 COUNT。
+后台定时全量重建以与 prompt_tag 保持同步。
+"""
+
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from app.core.db import SessionLocal
+from app.models import PromptTag
+from app.utils.periodic import PeriodicTask
+
+
+class TagEntry:
+    """索引中的标签"""
+
+    __slots__ = ("id", "name", "lower_name", "click_count", "created_at")
+
+    def __init__(self, tag_id: int, name: str, click_count: int, created_at: Optional[datetime]):
+        self.id = tag_id
+        self.name = name
+        self.lower_name = name.lower()
+        self.click_count = click_count or 0
+        self.created_at = created_at
+
+    @property
+    def rank_key(self) -> Tuple[int, float, int]:
+        """升序排列即为展示顺序的排序键"""
+        created_ts = self.created_at.timestamp() if self.created_at else float("-inf")
+        return (-self.click_count, -created_ts, -self.id)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "click_count": self.click_count,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None
+        }
+
+
+def _grams(text: str) -> Set[str]:
+    """拆分为二元组，单字文本返回自身"""
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class TagIndex(PeriodicTask):
+    """标签名称子串索引"""
+
+    def __init__(self, interval: float = 60):
+        """初始化索引
+
+        Args:
+            interval: 全量重建间隔（秒）
+        """
+        super().__init__(interval)
+        self._entries: Dict[int, TagEntry] = {}
+        self._bigrams: Dict[str, Set[int]] = {}
+        self._chars: Dict[str, Set[int]] = {}  # 单字查询使用
+        self._ranked: List[int] = []
+        self._rank_dirty = False
+        self.ready = False
+
+    def _build(self, entries: Dict[int, TagEntry]) -> None:
+        bigrams: Dict[str, Set[int]] = {}
+        chars: Dict[str, Set[int]] = {}
+        for entry in entries.values():
+            for gram in _grams(entry.lower_name):
+                bigrams.setdefault(gram, set()).add(entry.id)
+            for char in set(entry.lower_name):
+                chars.setdefault(char, set()).add(entry.id)
+
+        self._entries = entries
+        self._bigrams = bigrams
+        self._chars = chars
+        self._ranked = sorted(entries, key=lambda tag_id: entries[tag_id].rank_key)
+        self._rank_dirty = False
+        self.ready = True
+
+    async def run_once(self) -> None:
+        """从数据库全量重建索引"""
+        query = select(PromptTag.id, PromptTag.name, PromptTag.click_count, PromptTag.created_at).where(
+            PromptTag.status == 1
+        )
+        async with SessionLocal() as session:
+            session.info["read_only"] = True
+            rows = (await session.execute(query)).all()
+
+        self._build({
+            row.id: TagEntry(row.id, row.name or "", row.click_count, row.created_at)
+            for row in rows
+        })
+
+    def contains(self, tag_id: int) -> bool:
+        """标签是否存在且已启用，索引未就绪时返回 False"""
+        return tag_id in self._entries
+
+    def bump(self, tag_id: int, clicks: int = 1) -> None:
+        """增量调整标签点击数，下一次查询时重新排序"""
+        entry = self._entries.get(tag_id)
+        if entry is not None:
+            entry.click_count += clicks
+            self._rank_dirty = True
+
+    def _ranked_ids(self) -> List[int]:
+        if self._rank_dirty:
+            self._ranked.sort(key=lambda tag_id: self._entries[tag_id].rank_key)
+            self._rank_dirty = False
+        return self._ranked
+
+    def _match(self, keyword: str) -> Set[int]:
+        """返回名称包含关键词的标签ID"""
+        if len(keyword) == 1:
+            return set(self._chars.get(keyword, ()))
+
+        # 从最短的倒排列表开始求交集
+        postings = sorted((self._bigrams.get(gram, set()) for gram in _grams(keyword)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return candidates
+
+        # 二元组全部命中不代表连续出现，需再确认子串
+        return {tag_id for tag_id in candidates if keyword in self._entries[tag_id].lower_name}
+
+    def search(self, keyword: str = "", page: int = 1, page_size: int = 10) -> Optional[Dict]:
+        """搜索标签
+
+        Args:
+            keyword: 搜索关键词，为空时返回全部标签
+            page: 页码
+            page_size: 每页数量
+
+        Returns:
+            Dict: 与 PromptTagService.get_tag_list 相同结构的结果，索引未就绪时返回 None
+        """
+        if not self.ready:
+            return None
+
+        keyword = keyword.strip().lower()
+        offset = (page - 1) * page_size
+
+        if keyword:
+            matched = self._match(keyword)
+            total = len(matched)
+            # 只需排出前 offset + page_size 个
+            page_ids = heapq.nsmallest(
+                offset + page_size, matched, key=lambda tag_id: self._entries[tag_id].rank_key
+            )[offset:]
+        else:
+            ranked = self._ranked_ids()
+            total = len(ranked)
+            page_ids = ranked[offset:offset + page_size]
+
+        return {
+            "items": [self._entries[tag_id].to_dict() for tag_id in page_ids],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": (total + page_size - 1) // page_size
+        }
+
+
+tag_index = TagIndex()
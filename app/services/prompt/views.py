@@ -0,0 +1,160 @@
+"""提示词浏览量写回缓冲
+
+浏览提示词时只在内存中累加浏览量和用户最后浏览时间，由后台任务定时批量写回数据库，
+避免热门提示词每次读取都对同一行加锁更新。
+
+丢失边界：进程异常退出时最多丢失一个刷新周期（或 max_pending 条）内的浏览记录，
+正常关闭时会在生命周期结束前完成最后一次刷新。
+"""
+
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple, Any
+
+from sqlalchemy import update, case
+from sqlalchemy.dialects.mysql import insert
+
+from app.core.db import SessionLocal
+from app.models import Prompts, UserViewPrompts
+from app.utils.periodic import PeriodicTask
+
+
+class ViewCounterBuffer(PeriodicTask):
+    """浏览量写回缓冲"""
+
+    def __init__(self, interval: float = 5, max_pending: int = 50000, chunk_size: int = 1000):
+        """初始化浏览量缓冲
+
+        Args:
+            interval: 刷新间隔（秒）
+            max_pending: 缓冲的最大条目数，超过后新记录被丢弃并计入lost
+            chunk_size: 每条写回语句最多包含的提示词或浏览记录数
+        """
+        super().__init__(interval)
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self._view_counts: Dict[int, int] = {}
+        self._user_views: Dict[Tuple[int, int], datetime] = {}
+        self._oldest_pending: float = 0.0
+        self._flush_listeners: List[Callable[[Dict[int, int]], None]] = []
+        self._metrics = {
+            "flushes": 0,
+            "flush_errors": 0,
+            "flushed_views": 0,
+            "flushed_user_views": 0,
+            "lost": 0,
+            "last_flush_at": None,
+            "last_flush_seconds": 0.0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """待写回的条目数"""
+        return len(self._view_counts) + len(self._user_views)
+
+    def record(self, prompt_id: int, user_id: int = None) -> None:
+        """记录一次浏览
+
+        Args:
+            prompt_id: 提示词ID
+            user_id: 用户ID，可选
+        """
+        if self.pending >= self.max_pending and prompt_id not in self._view_counts:
+            self._metrics["lost"] += 1
+            return
+
+        if not self.pending:
+            self._oldest_pending = time.monotonic()
+
+        self._view_counts[prompt_id] = self._view_counts.get(prompt_id, 0) + 1
+        if user_id:
+            self._user_views[(user_id, prompt_id)] = datetime.now()
+
+    def add_flush_listener(self, listener: Callable[[Dict[int, int]], None]) -> None:
+        """注册写回成功后的回调，参数为本次写回的 {prompt_id: 浏览量增量}"""
+        self._flush_listeners.append(listener)
+
+    def pending_views(self, prompt_id: int) -> int:
+        """获取提示词尚未写回的浏览量"""
+        return self._view_counts.get(prompt_id, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓冲统计信息，flush_lag为最早一条未写回记录的等待秒数"""
+        return {
+            **self._metrics,
+            "pending": self.pending,
+            "flush_lag": time.monotonic() - self._oldest_pending if self.pending else 0.0,
+        }
+
+    async def run_once(self) -> None:
+        """将缓冲的浏览记录批量写回数据库"""
+        if not self.pending:
+            return
+
+        oldest_pending = self._oldest_pending
+        view_counts, self._view_counts = self._view_counts, {}
+        user_views, self._user_views = self._user_views, {}
+        view_items = list(view_counts.items())
+        user_view_items = list(user_views.items())
+        flushed_views: Dict[int, int] = {}
+        flushed_user_views = 0
+        started = time.monotonic()
+
+        try:
+            async with SessionLocal() as session:
+                # 分批写回并逐批提交，控制单条语句大小和行锁持有时间
+                for start in range(0, len(view_items), self.chunk_size):
+                    chunk = dict(view_items[start:start + self.chunk_size])
+                    await session.execute(
+                        update(Prompts).where(
+                            Prompts.id.in_(list(chunk))
+                        ).values(
+                            view_count=Prompts.view_count + case(chunk, value=Prompts.id, else_=0)
+                        )
+                    )
+                    await session.commit()
+                    flushed_views.update(chunk)
+
+                for start in range(0, len(user_view_items), self.chunk_size):
+                    chunk = user_view_items[start:start + self.chunk_size]
+                    # 多行插入，依赖 (user_id, prompt_id) 主键，已存在的浏览记录只更新浏览时间
+                    stmt = insert(UserViewPrompts).values([
+                        {"user_id": user_id, "prompt_id": prompt_id, "view_at": view_at}
+                        for (user_id, prompt_id), view_at in chunk
+                    ])
+                    await session.execute(stmt.on_duplicate_key_update(view_at=stmt.inserted.view_at))
+                    await session.commit()
+                    flushed_user_views += len(chunk)
+        except Exception:
+            # 未写回的批次合并回缓冲，等待下次重试
+            self._metrics["flush_errors"] += 1
+            self._restore(
+                {prompt_id: count for prompt_id, count in view_items if prompt_id not in flushed_views},
+                dict(user_view_items[flushed_user_views:]),
+            )
+            self._oldest_pending = oldest_pending
+            raise
+        finally:
+            self._metrics["flushed_views"] += sum(flushed_views.values())
+            self._metrics["flushed_user_views"] += flushed_user_views
+            # 已提交的批次即使后续批次失败也要通知，避免缓存中的浏览量回退
+            if flushed_views:
+                for listener in self._flush_listeners:
+                    listener(flushed_views)
+
+        self._metrics["flushes"] += 1
+        self._metrics["last_flush_at"] = str(datetime.now())
+        self._metrics["last_flush_seconds"] = time.monotonic() - started
+
+    def _restore(self, view_counts: Dict[int, int], user_views: Dict[Tuple[int, int], datetime]) -> None:
+        for prompt_id, count in view_counts.items():
+            self._view_counts[prompt_id] = self._view_counts.get(prompt_id, 0) + count
+        for key, view_at in user_views.items():
+            self._user_views.setdefault(key, view_at)
+
+    async def on_stop(self) -> None:
+        await self.run_once()
+
+
+# 进程内共享的浏览量缓冲
+view_buffer = ViewCounterBuffer()
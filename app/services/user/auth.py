@@ -7,6 +7,7 @@ from typing import Dict, Any
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth import token_cache
 from app.models import Users, UserTokens
 
 from app.services.verification import VerificationCodeService
@@ -106,7 +107,7 @@ class UserAuthService(UserBaseService):
         # 创建新用户
         user = Users(
             nickname=nickname,
-            password=self.get_password_hash(password),
+            password=await self.get_password_hash(password),
             avatar_url=avatar_path,
             email=target,
             points=0,
@@ -152,7 +153,7 @@ class UserAuthService(UserBaseService):
             raise ValueError("邮箱或密码错误")
 
         # 验证密码
-        if not self.verify_password(user.password, password):
+        if not await self.verify_password(user.password, password):
             raise ValueError("邮箱或密码错误")
 
         # 更新最后登录时间
@@ -191,7 +192,8 @@ class UserAuthService(UserBaseService):
         existing_token:UserTokens = result.scalar_one_or_none()
 
         if existing_token:
-            # 更新现有令牌记录
+            # 更新现有令牌记录，旧令牌立即失效
+            token_cache.invalidate(existing_token.access_token)
             existing_token.access_token = access_token
             existing_token.refresh_token = refresh_token
             existing_token.access_expires_at = access_expires
@@ -246,6 +248,7 @@ class UserAuthService(UserBaseService):
         # 清除令牌记录
         await self.db.delete(token_record)
         await self.db.commit()
+        token_cache.invalidate(access_token)
 
     async def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
         """刷新访问令牌
@@ -278,7 +281,8 @@ class UserAuthService(UserBaseService):
         # 设置新的过期时间
         new_access_expires = datetime.utcnow() + timedelta(days=7)  # 访问令牌过期时间
 
-        # 更新令牌记录
+        # 更新令牌记录，旧令牌立即失效
+        token_cache.invalidate(token_record.access_token)
         token_record.access_token = new_access_token
         token_record.access_expires_at = new_access_expires
 
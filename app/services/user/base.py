@@ -7,7 +7,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Users
-import bcrypt
+from app.utils.password import password_hasher
 
 class UserBaseService:
     """用户基础服务"""
@@ -15,15 +15,13 @@ class UserBaseService:
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
 
-    def get_password_hash(self, password: str) -> str:
-        """获取加密后密码"""
-        password = password.encode('utf-8')
-        return bcrypt.hashpw(password, bcrypt.gensalt()).decode('utf-8')
+    async def get_password_hash(self, password: str) -> str:
+        """获取加密后密码，在线程池中计算"""
+        return await password_hasher.hash(password)
 
-    def verify_password(self, hashed_password: str, password: str) -> bool:
-        """验证加密后的密码"""
-        password = password.encode('utf-8')
-        return bcrypt.checkpw(password, hashed_password.encode('utf-8'))
+    async def verify_password(self, hashed_password: str, password: str) -> bool:
+        """验证加密后的密码，在线程池中计算"""
+        return await password_hasher.verify(hashed_password, password)
 
     def _format_user_info(self, user: Users) -> Dict[str, Any]:
         """格式化用户信息
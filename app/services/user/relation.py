@@ -0,0 +1,142 @@
+"""浏览者关系查询
+
+批量回答浏览者是否点赞、收藏了一批提示词以及是否关注了一批作者。
+每种关系每批最多一条查询，只查询本批目标ID（user_likes、user_follows 的 user_id、follower_id 没有索引，
+按目标ID过滤才能用上 idx_target_type、idx_prompt_id、idx_following_id）。
+查询结果（包括否定结果）按浏览者缓存，同一浏览者再次看到相同目标时不再访问数据库。
+通过ORM写入点赞、收藏后自动失效本进程中该用户的缓存，关注等非ORM写入需调用 invalidate；
+其他进程的缓存不会失效，依靠较短的有效期保证最多 ttl 秒内看到变化。
+"""
+
+from typing import Any, Dict, Iterable, Set
+
+from sqlalchemy import select, func, event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import RoutingSession
+from app.models import UserLikes, UserFavoritePrompts, t_user_follows
+from app.utils.cache import TTLCache
+
+LIKED = "liked"
+FAVORITED = "favorited"
+FOLLOWED = "followed"
+
+
+def _relation_query(relation: str, user_id: int, target_ids: Set[int]):
+    """构建查询用户与一批目标是否存在某种关系的语句，返回存在关系的目标ID"""
+    if relation == LIKED:
+        return select(UserLikes.target_id).where(
+            UserLikes.target_type == "prompt",
+            UserLikes.target_id.in_(target_ids),
+            UserLikes.user_id == user_id,
+            func.coalesce(UserLikes.is_deleted, 0) == 0
+        )
+    if relation == FAVORITED:
+        return select(UserFavoritePrompts.prompt_id).where(
+            UserFavoritePrompts.prompt_id.in_(target_ids),
+            UserFavoritePrompts.user_id == user_id,
+            func.coalesce(UserFavoritePrompts.is_deleted, 0) == 0
+        )
+    return select(t_user_follows.c.following_id).where(
+        t_user_follows.c.following_id.in_(target_ids),
+        t_user_follows.c.follower_id == user_id,
+        func.coalesce(t_user_follows.c.is_deleted, 0) == 0
+    )
+
+
+class RelationResolver:
+    """浏览者关系批量查询"""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 30, max_targets: int = 2000):
+        """初始化关系查询
+
+        Args:
+            maxsize: 最多缓存的 (用户, 关系) 条目数
+            ttl: 缓存有效期（秒），也是其他进程写入后最多看到旧状态的时间
+            max_targets: 每个 (用户, 关系) 最多缓存的目标数，超过后清空重新积累
+        """
+        self.max_targets = max_targets
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._metrics = {"queries": 0, "cached_answers": 0, "queried_answers": 0}
+
+    def invalidate(self, user_id: int) -> None:
+        """用户的点赞、收藏、关注发生变化后清除其缓存"""
+        for relation in (LIKED, FAVORITED, FOLLOWED):
+            self._cache.invalidate((user_id, relation))
+
+    async def _resolve(self, db: AsyncSession, user_id: int, relation: str, target_ids: Set[int]) -> Set[int]:
+        """返回 target_ids 中与用户存在该关系的ID"""
+        key = (user_id, relation)
+        answers: Dict[int, bool] = self._cache.get(key)
+        if answers is None:
+            answers = {}
+
+        missing = target_ids - answers.keys()
+        self._metrics["cached_answers"] += len(target_ids) - len(missing)
+        if missing:
+            result = await db.execute(_relation_query(relation, user_id, missing))
+            found = set(result.scalars().all())
+            self._metrics["queries"] += 1
+            self._metrics["queried_answers"] += len(missing)
+
+            if len(answers) + len(missing) > self.max_targets:
+                answers = {}
+            answers.update((target_id, target_id in found) for target_id in missing)
+            self._cache.set(key, answers)
+
+        return {target_id for target_id in target_ids if answers.get(target_id)}
+
+    async def resolve(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        prompt_ids: Iterable[int] = (),
+        author_ids: Iterable[int] = (),
+    ) -> Dict[str, Set[int]]:
+        """批量查询浏览者与一批提示词、作者的关系
+
+        Args:
+            db: 数据库会话
+            user_id: 浏览者ID，为空时所有关系均为否
+            prompt_ids: 提示词ID
+            author_ids: 作者ID
+
+        Returns:
+            Dict: {"liked": 已点赞的提示词ID, "favorited": 已收藏的提示词ID, "followed": 已关注的作者ID}
+        """
+        prompt_ids, author_ids = set(prompt_ids), set(author_ids)
+        if not user_id:
+            return {LIKED: set(), FAVORITED: set(), FOLLOWED: set()}
+
+        return {
+            LIKED: await self._resolve(db, user_id, LIKED, prompt_ids) if prompt_ids else set(),
+            FAVORITED: await self._resolve(db, user_id, FAVORITED, prompt_ids) if prompt_ids else set(),
+            FOLLOWED: await self._resolve(db, user_id, FOLLOWED, author_ids) if author_ids else set(),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """获取关系查询统计信息"""
+        return {**self._metrics, "cache": self._cache.stats()}
+
+
+# 进程内共享的关系查询
+relation_resolver = RelationResolver()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("relation_users", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (UserLikes, UserFavoritePrompts)) and obj.user_id:
+            changed.add(obj.user_id)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("relation_users", ()):
+        relation_resolver.invalidate(user_id)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("relation_users", None)
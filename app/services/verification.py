@@ -1,29 +1,69 @@
+import asyncio
 import random
 import string
+import time
 from typing import Optional, Tuple
 from datetime import datetime, timedelta
 
 import email_validator
+import phonenumbers
 
-from sqlalchemy import select, and_, or_, delete
+from sqlalchemy import select, update, or_, delete, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
 
-from app.core.config import smtp
+from app.core.config import smtp, sms
+from app.core.db import engine, SessionLocal
 from app.utils import email
+from app.utils.sms import SmsUtil, SmsDeliveryQueue, SmsStatusPoller
+from app.utils.batch import InsertBatcher
+from app.utils.periodic import PeriodicTask
+from app.utils.cache import TTLCache
+from app.utils.ratelimit import TokenBucketLimiter
 from app.models import VerificationCodes
 
+# 进程内共享的邮件服务和投递队列
+email_util = email.EmailUtil(
+    smtp_host=smtp.HOST,
+    smtp_port=smtp.PORT,
+    username=smtp.USERNAME,
+    password=smtp.PASSWORD,
+    use_protocol=smtp.PROTOCOL,
+)
+email_queue = email.EmailDeliveryQueue(email_util)
+
+# 进程内共享的短信服务、投递队列和发送状态查询任务
+sms_util = SmsUtil(
+    access_key_id=sms.ACCESS_KEY_ID,
+    access_key_secret=sms.ACCESS_KEY_SECRET,
+    sign_name=sms.SIGN_NAME,
+    endpoint=sms.ENDPOINT,
+)
+sms_status_poller = SmsStatusPoller(sms_util)
+sms_queue = SmsDeliveryQueue(
+    sms_util,
+    sms_status_poller,
+    # 短信最终未发出时解除冷却，用户可以立即重新获取验证码
+    on_failed=lambda phone, template_code: recent_targets.invalidate(phone),
+)
+
+# 验证码发送冷却时间（秒），冷却期内对同一目标的重复请求不再生成和发送新验证码
+SEND_COOLDOWN = 60
+
+# 并发创建的验证码合并为多行插入
+code_batcher = InsertBatcher(SessionLocal, VerificationCodes)
+# 冷却期内已发送验证码的目标
+recent_targets = TTLCache(maxsize=100000, ttl=SEND_COOLDOWN)
+# 每个目标每小时最多5次，每个IP每小时最多20次
+target_limiter = TokenBucketLimiter(rate=5 / 3600, capacity=5)
+ip_limiter = TokenBucketLimiter(rate=20 / 3600, capacity=20)
+
 class VerificationCodeService:
     """验证码服务"""
 
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
-        self.email_util = email.EmailUtil(
-            smtp_host=smtp.HOST,
-            smtp_port=smtp.PORT,
-            username=smtp.USERNAME,
-            password=smtp.PASSWORD,
-            use_protocol=smtp.PROTOCOL,
-        )
+        self.email_util = email_util
 
     @staticmethod
     def generate_code(length: int = 6):
@@ -49,16 +89,62 @@ class VerificationCodeService:
         except email_validator.EmailNotValidError:
             raise ValueError("无效的邮箱地址")
 
-    async def create_code(self, target: str, name: str, expires_in: int = 600) -> str:
+    @staticmethod
+    def normalize_phone(phone: str, region: str = "CN") -> str:
+        """
+        规范化手机号，中国大陆号码返回11位号码，其余返回不带+的国际号码
+        """
+        try:
+            number = phonenumbers.parse(phone, region)
+        except phonenumbers.NumberParseException:
+            raise ValueError("无效的手机号")
+        if not phonenumbers.is_valid_number(number):
+            raise ValueError("无效的手机号")
+        if number.country_code == 86:
+            return str(number.national_number)
+        return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164).lstrip("+")
+
+    def _check_send_limit(self, target: str, client_ip: Optional[str]) -> bool:
+        """发送频率检查
+
+        Returns:
+            bool: 目标是否处于冷却期，处于冷却期时不应重复发送
+
+        Raises:
+            HTTPException: 目标或IP请求过于频繁时返回429
+        """
+        # 冷却期内的重复请求
+        if recent_targets.peek(target) is not None:
+            return True
+
+        # 按目标和IP限流
+        if not target_limiter.allow(target):
+            raise HTTPException(status_code=429, detail="请求过于频繁，请稍后再试")
+        if client_ip and not ip_limiter.allow(client_ip):
+            target_limiter.refund(target)
+            raise HTTPException(status_code=429, detail="请求过于频繁，请稍后再试")
+
+        # 写入前先占位，避免并发的重复请求各自生成验证码
+        recent_targets.set(target, True)
+        return False
+
+    async def create_code(self, target: str, name: str, expires_in: int = 600, client_ip: Optional[str] = None) -> str:
         """创建新的邮箱验证码
 
+        冷却期内对同一目标的重复请求直接返回成功，沿用已发送的验证码。
+
         Args:
             target: 目标邮箱
             name: 验证码名称 (如: 注册、登录、修改密码等)
             expires_in: 过期时间(秒)，默认10分钟
+            client_ip: 请求方IP，用于限流
 
         Returns:
             str: 生成的验证码
+
+        Raises:
+            ValueError: 邮箱无效或发送队列已满
+            HTTPException: 目标或IP请求过于频繁时返回429
         """
 
         if not self.is_email(target):
@@ -66,19 +152,108 @@ class VerificationCodeService:
 
         target = self.normalize_email(target)
 
-        verification = VerificationCodes(
-            target=target,
-            type=2,  # 邮箱验证码
-            code=self.generate_code(),
-            expired_at=datetime.utcnow() + timedelta(seconds=expires_in),
-            created_at=datetime.utcnow(),
-            is_used=0
-        )
+        if self._check_send_limit(target, client_ip):
+            return True
+
+        code = self.generate_code()
+        try:
+            await code_batcher.add({
+                "target": target,
+                "type": 2,  # 邮箱验证码
+                "code": code,
+                "expired_at": datetime.utcnow() + timedelta(seconds=expires_in),
+                "created_at": datetime.utcnow(),
+                "is_used": 0,
+            })
 
-        self.db.add(verification)
+            # 验证码已保存，邮件交给投递队列在后台发送
+            try:
+                email_queue.enqueue(self.email_util.build_verification_message(to_addr=target, code=code, subject=name))
+            except asyncio.QueueFull:
+                raise ValueError("验证码发送繁忙，请稍后重试")
+        except BaseException:
+            recent_targets.invalidate(target)
+            raise
+
+        return True
+
+    async def _consume_code(self, target: str, code_type: int, code: str) -> bool:
+        """原子地将验证码标记为已使用
+
+        使用一条条件UPDATE完成校验和标记，条件顺序与 idx_target_type_expired 一致，
+        并发提交同一验证码时只有一个请求的影响行数不为0。
+
+        Args:
+            target: 手机号或邮箱地址
+            code_type: 1-手机验证码 2-邮箱验证码
+            code: 验证码
+
+        Returns:
+            bool: 验证码是否有效且由本次请求消费
+        """
+        query = update(VerificationCodes).where(
+            VerificationCodes.target == target,
+            VerificationCodes.type == code_type,
+            VerificationCodes.expired_at > datetime.utcnow(),
+            VerificationCodes.is_used == 0,
+            VerificationCodes.code == code,
+        ).values(is_used=1).execution_options(synchronize_session=False)
+
+        result = await self.db.execute(query)
         await self.db.commit()
+        return result.rowcount > 0
+
+    async def create_sms_code(self, phone: str, expires_in: int = 300, client_ip: Optional[str] = None) -> bool:
+        """创建新的短信验证码
+
+        验证码写入 verification_codes 表，短信交给投递队列批量发送。
+
+        Args:
+            phone: 目标手机号
+            expires_in: 过期时间(秒)，默认5分钟
+            client_ip: 请求方IP，用于限流
+
+        Raises:
+            ValueError: 手机号无效或发送队列已满
+            HTTPException: 目标或IP请求过于频繁时返回429
+        """
+        phone = self.normalize_phone(phone)
+
+        if self._check_send_limit(phone, client_ip):
+            return True
+
+        code = self.generate_code()
+        try:
+            await code_batcher.add({
+                "target": phone,
+                "type": 1,  # 手机验证码
+                "code": code,
+                "expired_at": datetime.utcnow() + timedelta(seconds=expires_in),
+                "created_at": datetime.utcnow(),
+                "is_used": 0,
+            })
 
-        await self.email_util.send_verification_code(to_addr=target, code=verification.code, subject=name)
+            try:
+                sms_queue.enqueue(phone, sms.VERIFY_TEMPLATE_CODE, {"code": code})
+            except asyncio.QueueFull:
+                raise ValueError("验证码发送繁忙，请稍后重试")
+        except BaseException:
+            recent_targets.invalidate(phone)
+            raise
+
+        return True
+
+    async def verify_sms_code(self, phone: str, code: str):
+        """校验短信验证码
+
+        Args:
+            phone: 目标手机号
+            code: 验证码
+        """
+        phone = self.normalize_phone(phone)
+
+        if not await self._consume_code(phone, 1, code):
+            raise ValueError("验证码不存在或已过期")
 
         return True
 
@@ -95,40 +270,134 @@ class VerificationCodeService:
 
         target = self.normalize_email(target)
 
-        query = select(VerificationCodes).where(
-            and_(
-                VerificationCodes.target == target,
-                VerificationCodes.code == code,
-                VerificationCodes.expired_at > datetime.utcnow(),
-                VerificationCodes.is_used == 0
-            )
-        )
-        # 查询验证码
-        verification = await self.db.execute(query)
-        verification = verification.scalar_one_or_none()
-
-        if not verification:
+        if not await self._consume_code(target, 2, code):
             raise ValueError("验证码不存在或已过期")
 
-        verification.is_used = 1 # 标记验证码为已使用
-        await self.db.commit()
-
         return True
 
-    async def clean_codes(self) -> int:
-        """删除过期的验证码
+    async def clean_codes(self, chunk_size: int = 1000, pause: float = 0.1, max_chunks: Optional[int] = None) -> int:
+        """按主键分批删除过期或已使用的验证码
+
+        每批先按主键顺序查出不超过 chunk_size 条待删除记录，再按主键删除并提交，
+        批次之间暂停 pause 秒，避免长时间锁表。
+
+        Args:
+            chunk_size: 每批删除的最大行数
+            pause: 批次之间的暂停时间（秒）
+            max_chunks: 最多执行的批次数，None表示删除全部
 
         Returns:
             int: 清理的记录数量
         """
-        query = delete(VerificationCodes).where(
-            or_(
-                VerificationCodes.expired_at < datetime.utcnow(),
-                VerificationCodes.is_used == 1
-            )
-        )
+        now = datetime.utcnow()
+        deleted = 0
+        last_id = 0
+        chunks = 0
 
-        result = await self.db.execute(query)
-        await self.db.commit()
+        while max_chunks is None or chunks < max_chunks:
+            ids = (await self.db.execute(
+                select(VerificationCodes.id).where(
+                    VerificationCodes.id > last_id,
+                    or_(
+                        VerificationCodes.expired_at < now,
+                        VerificationCodes.is_used == 1
+                    )
+                ).order_by(VerificationCodes.id).limit(chunk_size)
+            )).scalars().all()
+            if not ids:
+                break
+
+            result = await self.db.execute(delete(VerificationCodes).where(VerificationCodes.id.in_(ids)))
+            await self.db.commit()
+
+            deleted += result.rowcount
+            last_id = ids[-1]
+            chunks += 1
+
+            if len(ids) < chunk_size:
+                break
+            await asyncio.sleep(pause)
+
+        return deleted
+
+
+class VerificationCodeReaper(PeriodicTask):
+    """验证码定时清理任务
+
+    每个 worker 进程都会启动该任务，通过 MySQL GET_LOCK 保证同一时间只有一个进程在清理，
+    其余进程本周期直接跳过，避免多个进程扫描和删除相同的主键范围。
+    """
+
+    LOCK_NAME = "lex:verification_code_reap"
+
+    def __init__(self, interval: float = 600, chunk_size: int = 1000, pause: float = 0.1):
+        """初始化清理任务
+
+        Args:
+            interval: 清理间隔（秒）
+            chunk_size: 每批删除的最大行数
+            pause: 批次之间的暂停时间（秒）
+        """
+        super().__init__(interval)
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.last_result = {"deleted": 0, "seconds": 0.0, "rows_per_second": 0.0}
+
+    async def run_once(self) -> Optional[dict]:
+        """执行一次清理
+
+        Returns:
+            dict: 删除行数、耗时和每秒删除行数，已有其他进程在清理时返回None
+        """
+        async with engine.connect() as lock_conn:
+            locked = (await lock_conn.execute(
+                text("SELECT GET_LOCK(:name, 0)"), {"name": self.LOCK_NAME}
+            )).scalar()
+            if not locked:
+                return None
+
+            try:
+                return await self._run()
+            finally:
+                await lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": self.LOCK_NAME})
+
+    async def _run(self) -> dict:
+        started = time.monotonic()
+        async with SessionLocal() as session:
+            deleted = await VerificationCodeService(session).clean_codes(self.chunk_size, self.pause)
+        seconds = time.monotonic() - started
+
+        self.last_result = {
+            "deleted": deleted,
+            "seconds": seconds,
+            "rows_per_second": deleted / seconds if seconds else 0.0,
+        }
+        if deleted:
+            print(f"\033[92m-已清理验证码 {deleted} 条，耗时 {seconds:.2f} 秒，{self.last_result['rows_per_second']:.0f} 条/秒\033[0m")
+        return self.last_result
+
+
+# 进程内共享的验证码清理任务
+code_reaper = VerificationCodeReaper()
+
+
+if __name__ == "__main__":
+    # 作为独立维护任务运行: python -m app.services.verification [--chunk-size 1000] [--pause 0.1]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="清理过期或已使用的验证码")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="每批删除的最大行数")
+    parser.add_argument("--pause", type=float, default=0.1, help="批次之间的暂停时间（秒）")
+    args = parser.parse_args()
+
+    async def main():
+        try:
+            result = await VerificationCodeReaper(chunk_size=args.chunk_size, pause=args.pause).run_once()
+            if result is None:
+                print("其他进程正在清理，跳过本次")
+                return
+            print(f"清理 {result['deleted']} 条，耗时 {result['seconds']:.2f} 秒，{result['rows_per_second']:.0f} 条/秒")
+        finally:
+            await engine.dispose()
 
-        return result.rowcount
+    asyncio.run(main())
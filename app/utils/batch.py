@@ -0,0 +1,103 @@
+"""批量写入模块
+
+将并发请求中的单行插入合并为多行INSERT，减少数据库往返和提交次数。
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import insert
+
+
+class InsertBatcher:
+    """多行插入合并器
+
+    第一条记录到达后最多等待 max_delay 秒或凑满 max_batch 条，合并为一条INSERT提交，
+    每个调用方在所属批次提交完成后返回，提交失败时所有调用方收到同一异常。
+    """
+
+    def __init__(self, session_factory: Callable, table: Any, max_batch: int = 200, max_delay: float = 0.02):
+        """初始化合并器
+
+        Args:
+            session_factory: 数据库会话工厂
+            table: 目标ORM模型或表
+            max_batch: 每批最多合并的行数
+            max_delay: 第一条记录到达后的最长等待时间（秒）
+        """
+        self.session_factory = session_factory
+        self.table = table
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # 事件循环只保留任务的弱引用，定时触发的刷新任务需在此持有直到完成
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._metrics = {"rows": 0, "batches": 0, "errors": 0}
+
+    async def add(self, row: Dict[str, Any]) -> None:
+        """加入一行并等待所属批次提交完成
+
+        Args:
+            row: 列名到值的字典
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush(loop, 0)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop, self.max_delay)
+
+        await future
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        task = asyncio.ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> None:
+        """立即提交当前所有待写入的行"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if not batch:
+            return
+        if self._pending:
+            # 同一轮事件循环中加入的行可能超过 max_batch，剩余的行另起一批
+            delay = 0 if len(self._pending) >= self.max_batch else self.max_delay
+            self._schedule_flush(asyncio.get_running_loop(), delay)
+
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(self.table).values([row for row, _ in batch]))
+                await session.commit()
+        except Exception as e:
+            self._metrics["errors"] += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._metrics["rows"] += len(batch)
+        self._metrics["batches"] += 1
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取合并统计信息"""
+        batches = self._metrics["batches"]
+        return {
+            **self._metrics,
+            "pending": len(self._pending),
+            "avg_batch_size": self._metrics["rows"] / batches if batches else 0.0,
+        }
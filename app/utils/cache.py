@@ -0,0 +1,100 @@
+"""缓存模块
+
+提供进程内的 TTL + LRU 缓存，并统计命中、未命中、淘汰次数。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """带过期时间的LRU缓存"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        """初始化缓存
+
+        Args:
+            maxsize: 最大缓存条目数，超过后淘汰最久未使用的条目
+            ttl: 条目有效期（秒）
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key) is not None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值，未命中或已过期时返回default"""
+        item = self._data.get(key)
+        if item is None:
+            self._metrics["misses"] += 1
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self._metrics["expirations"] += 1
+            self._metrics["misses"] += 1
+            return default
+
+        self._data.move_to_end(key)
+        self._metrics["hits"] += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """获取未过期的缓存值，不影响LRU顺序和统计"""
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            return None
+        return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 单独指定的有效期（秒），默认使用缓存的ttl
+        """
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._metrics["evictions"] += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """删除缓存条目
+
+        Returns:
+            bool: 条目是否存在
+        """
+        if self._data.pop(key, None) is None:
+            return False
+        self._metrics["invalidations"] += 1
+        return True
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        lookups = self._metrics["hits"] + self._metrics["misses"]
+        return {
+            **self._metrics,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hit_rate": self._metrics["hits"] / lookups if lookups else 0.0,
+        }
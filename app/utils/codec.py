@@ -0,0 +1,57 @@
+"""结构化数据编解码模块
+
+提示词的 content、images 等TEXT字段统一以JSON格式存储，使用orjson编解码。
+旧数据为Python字面量格式，解码时回退到 ast.literal_eval 安全解析，不再使用 eval。
+"""
+
+import ast
+from typing import Any
+
+import orjson
+
+
+def dumps(value: Any) -> str:
+    """将数据编码为JSON字符串，中文不转义"""
+    return orjson.dumps(value).decode("utf-8")
+
+
+def loads(text: str, default: Any = None) -> Any:
+    """解码JSON字符串，兼容旧的Python字面量格式
+
+    Args:
+        text: 存储的字符串
+        default: 字符串为空时返回的默认值
+
+    Returns:
+        Any: 解码后的数据
+
+    Raises:
+        ValueError: 既不是JSON也不是合法的Python字面量
+    """
+    if not text:
+        return default
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return loads_legacy(text)
+
+
+def loads_legacy(text: str) -> Any:
+    """解码旧的Python字面量格式
+
+    Raises:
+        ValueError: 不是合法的Python字面量
+    """
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        raise ValueError("无法解析的存储格式")
+
+
+def is_json(text: str) -> bool:
+    """判断字符串是否已经是JSON格式"""
+    try:
+        orjson.loads(text)
+        return True
+    except orjson.JSONDecodeError:
+        return False
@@ -0,0 +1,76 @@
+"""游标分页模块
+
+提供不透明的游标令牌编解码，用于键集（keyset）分页。
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, Type, Union
+
+# 游标中每个排序键允许的类型，如 (int, (datetime, type(None)), int)
+CursorTypes = Sequence[Union[Type, Tuple[Type, ...]]]
+
+_DATETIME_TAG = "$dt"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and _DATETIME_TAG in value:
+        return datetime.fromisoformat(value[_DATETIME_TAG])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """将排序键编码为游标令牌
+
+    Args:
+        values: 最后一条记录的排序键，如 (view_count, created_at, id)
+
+    Returns:
+        str: URL安全的游标令牌
+    """
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _check_type(value: Any, expected: Union[Type, Tuple[Type, ...]]) -> bool:
+    expected = expected if isinstance(expected, tuple) else (expected,)
+    # bool 是 int 的子类，不能当作整数排序键
+    if isinstance(value, bool) and bool not in expected:
+        return False
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str, size: int, types: Optional[CursorTypes] = None) -> Optional[List[Any]]:
+    """解析游标令牌
+
+    Args:
+        cursor: 游标令牌，为空表示第一页
+        size: 排序键个数
+        types: 每个排序键允许的类型，传入时逐个校验
+
+    Returns:
+        Optional[List]: 排序键列表，第一页返回None
+
+    Raises:
+        ValueError: 游标格式错误或排序键类型不符
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_value(v) for v in values]
+    except Exception:
+        raise ValueError("无效的游标")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("无效的游标")
+    if types is not None and not all(_check_type(v, t) for v, t in zip(values, types)):
+        raise ValueError("无效的游标")
+    return values
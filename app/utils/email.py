@@ -1,16 +1,170 @@
 """邮件服务模块
 
 提供邮件发送功能，支持HTML内容和附件。用于系统通知、验证码等场景。
+发送复用连接池中已认证的SMTP会话，并可通过投递队列在后台异步发送。
 """
 
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.utils import formataddr
 import aiosmtplib
+import asyncio
+import os
+import re
+import time
+import traceback
 
-from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
+from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
 
+
+class SMTPConnectionPool:
+    """SMTP连接池
+
+    复用已完成加密握手和登录的SMTP会话，空闲超过 idle_check 秒的连接在取用前发送NOOP检测，
+    检测失败或发送失败的连接会被关闭并在下次取用时重新建立。
+    """
+
+    def __init__(
+        self,
+        smtp_host: str,
+        smtp_port: int,
+        username: str,
+        password: str,
+        use_protocol: str = "tls",
+        size: int = 4,
+        idle_check: float = 30,
+        max_idle: float = 300,
+        timeout: float = 30,
+    ):
+        """初始化连接池
+
+        Args:
+            smtp_host: SMTP服务器地址
+            smtp_port: SMTP服务器端口
+            username: SMTP认证用户名
+            password: SMTP认证密码
+            use_protocol: 使用的加密协议（tls或ssl）
+            size: 最大连接数
+            idle_check: 空闲超过该秒数的连接取用前先做NOOP检测
+            max_idle: 空闲超过该秒数的连接直接关闭重建
+            timeout: 连接和命令超时时间（秒）
+        """
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.username = username
+        self.password = password
+        self.use_protocol = use_protocol.lower()
+        self.size = size
+        self.idle_check = idle_check
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._metrics = {
+            "connects": 0,
+            "reuses": 0,
+            "health_check_failures": 0,
+            "discards": 0,
+        }
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        server = aiosmtplib.SMTP(
+            hostname=self.smtp_host,
+            port=self.smtp_port,
+            use_tls=self.use_protocol == 'ssl',
+            start_tls=self.use_protocol == 'tls',
+            timeout=self.timeout,
+        )
+        await server.connect()
+        await server.login(self.username, self.password)
+        self._metrics["connects"] += 1
+        return server
+
+    @staticmethod
+    async def _close(server: aiosmtplib.SMTP) -> None:
+        try:
+            if server.is_connected:
+                await server.quit()
+        except Exception:
+            server.close()
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        now = time.monotonic()
+        while self._idle:
+            server, idle_since = self._idle.pop()
+            idle = now - idle_since
+            if not server.is_connected or idle > self.max_idle:
+                await self._close(server)
+                continue
+            if idle > self.idle_check:
+                try:
+                    await server.noop()
+                except aiosmtplib.SMTPException:
+                    self._metrics["health_check_failures"] += 1
+                    await self._close(server)
+                    continue
+            self._metrics["reuses"] += 1
+            return server
+        return await self._connect()
+
+    @asynccontextmanager
+    async def connection(self):
+        """取用一个已认证的SMTP连接，使用中出错的连接会被丢弃"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+
+        async with self._semaphore:
+            server = await self._acquire()
+            try:
+                yield server
+            except BaseException:
+                self._metrics["discards"] += 1
+                await self._close(server)
+                raise
+            else:
+                self._idle.append((server, time.monotonic()))
+
+    async def close(self) -> None:
+        """关闭所有空闲连接"""
+        idle, self._idle = self._idle, []
+        for server, _ in idle:
+            await self._close(server)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        return {**self._metrics, "idle": len(self._idle), "size": self.size}
+
+
+class EmailTemplate:
+    """预编译的邮件模板
+
+    模板中的 {name} 占位符在加载时被切分为字面量片段和变量名，
+    渲染时一次拼接完成；上下文中未提供的占位符原样保留。
+    """
+
+    PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+    def __init__(self, source: str):
+        self._segments: List[str] = []
+        self._keys: List[str] = []
+        position = 0
+        for match in self.PLACEHOLDER.finditer(source):
+            self._segments.append(source[position:match.start()])
+            self._keys.append(match.group(1))
+            position = match.end()
+        self._segments.append(source[position:])
+
+    def render(self, context: Dict[str, Any]) -> str:
+        """渲染模板"""
+        parts = [self._segments[0]]
+        for key, segment in zip(self._keys, self._segments[1:]):
+            parts.append(str(context[key]) if key in context else f"{{{key}}}")
+            parts.append(segment)
+        return "".join(parts)
+
+
 class EmailUtil:
     """邮件服务类"""
 
@@ -22,7 +176,8 @@ class EmailUtil:
         password: str,
         default_sender: str = None,
         use_protocol: str = "tls",
-        templates_dir: str = "data/templates/email"
+        templates_dir: str = "data/templates/email",
+        pool_size: int = 4,
     ):
         """初始化邮件服务
 
@@ -34,6 +189,7 @@ class EmailUtil:
             default_sender: 默认发件人
             use_protocol: 使用的加密协议（tls或ssl）
             templates_dir: 邮件模板目录
+            pool_size: SMTP连接池大小
         """
         self.smtp_host = smtp_host
         self.smtp_port = smtp_port
@@ -42,32 +198,67 @@ class EmailUtil:
         self.default_sender = default_sender or username
         self.use_protocol = use_protocol.lower()
         self.templates_dir = Path(templates_dir)
+        self.template_check_interval = 2  # 检查模板文件修改时间的最短间隔（秒）
+        self._templates: Dict[str, Tuple[float, float, EmailTemplate]] = {}  # 模板名: (mtime, 检查时间, 模板)
+        self._from_headers: Dict[str, str] = {}
+        self.pool = SMTPConnectionPool(
+            smtp_host=smtp_host,
+            smtp_port=smtp_port,
+            username=username,
+            password=password,
+            use_protocol=use_protocol,
+            size=pool_size,
+        )
 
-    def load_and_render_template(self, template_name: str, context: Dict[str, Any]) -> str:
-        """加载并渲染邮件模板
+    def load_template(self, template_name: str) -> EmailTemplate:
+        """加载预编译的模板，文件修改后自动重新编译
 
         Args:
             template_name: 模板文件名
-            context: 模板变量
 
         Returns:
-            str: 渲染后的内容
+            EmailTemplate: 预编译的模板
 
         Raises:
             FileNotFoundError: 模板文件不存在时抛出
         """
+        now = time.monotonic()
+        cached = self._templates.get(template_name)
+        if cached and now - cached[1] < self.template_check_interval:
+            return cached[2]
+
         template_path = self.templates_dir / template_name
-        if not template_path.exists():
+        try:
+            mtime = os.stat(template_path).st_mtime
+        except FileNotFoundError:
+            self._templates.pop(template_name, None)
             raise FileNotFoundError(f"Template not found: {template_name}")
 
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template = f.read()
+        if cached and cached[0] == mtime:
+            template = cached[2]
+        else:
+            with open(template_path, 'r', encoding='utf-8') as f:
+                template = EmailTemplate(f.read())
 
-        for key, value in context.items():
-            template = template.replace(f"{{{key}}}", str(value))
+        self._templates[template_name] = (mtime, now, template)
         return template
 
-    async def send_email(
+    def load_and_render_template(self, template_name: str, context: Dict[str, Any]) -> str:
+        """加载并渲染邮件模板
+
+        Args:
+            template_name: 模板文件名
+            context: 模板变量
+
+        Returns:
+            str: 渲染后的内容
+
+        Raises:
+            FileNotFoundError: 模板文件不存在时抛出
+        """
+        return self.load_template(template_name).render(context)
+
+    def build_message(
         self,
         to_addrs: List[str],
         subject: str,
@@ -75,8 +266,8 @@ class EmailUtil:
         html: bool = False,
         sender: str = None,
         attachments: List[Path] = None
-    ) -> None:
-        """发送邮件
+    ) -> MIMEMultipart:
+        """构建邮件
 
         Args:
             to_addrs: 收件人列表
@@ -85,10 +276,18 @@ class EmailUtil:
             html: 是否为HTML内容
             sender: 发件人，不指定则使用默认发件人
             attachments: 附件列表
+
+        Returns:
+            MIMEMultipart: 邮件对象
         """
+        sender = sender or self.default_sender
+        from_header = self._from_headers.get(sender)
+        if from_header is None:
+            from_header = self._from_headers[sender] = formataddr(('LexTrade', sender))
+
         msg = MIMEMultipart()
         msg['Subject'] = subject
-        msg['From'] = formataddr(('LexTrade', sender or self.default_sender))
+        msg['From'] = from_header
         msg['To'] = ', '.join(to_addrs)
 
         # 设置邮件内容
@@ -104,22 +303,37 @@ class EmailUtil:
                     part['Content-Disposition'] = f'attachment; filename="{attachment.name}"'
                     msg.attach(part)
 
-        # 发送邮件
-        if self.use_protocol == 'ssl':
-            # 使用SSL连接
-            async with aiosmtplib.SMTP(hostname=self.smtp_host, port=self.smtp_port, use_tls=True) as server:
-                await server.login(self.username, self.password)
-                await server.send_message(msg)
-        else:
-            # 使用普通连接或TLS
-            async with aiosmtplib.SMTP(hostname=self.smtp_host, port=self.smtp_port) as server:
-                if self.use_protocol == 'tls':
-                    await server.starttls()
-                await server.login(self.username, self.password)
-                await server.send_message(msg)
+        return msg
 
-    async def send_verification_code(self, to_addr: str, code: str, subject: str) -> None:
-        """发送验证码邮件
+    async def send_message(self, msg: MIMEMultipart) -> None:
+        """通过连接池发送已构建的邮件"""
+        async with self.pool.connection() as server:
+            await server.send_message(msg)
+
+    async def send_email(
+        self,
+        to_addrs: List[str],
+        subject: str,
+        content: str,
+        html: bool = False,
+        sender: str = None,
+        attachments: List[Path] = None
+    ) -> None:
+        """发送邮件
+
+        Args:
+            to_addrs: 收件人列表
+            subject: 邮件主题
+            content: 邮件内容
+            html: 是否为HTML内容
+            sender: 发件人，不指定则使用默认发件人
+            attachments: 附件列表
+        """
+        msg = self.build_message(to_addrs, subject, content, html, sender, attachments)
+        await self.send_message(msg)
+
+    def build_verification_message(self, to_addr: str, code: str, subject: str) -> MIMEMultipart:
+        """构建验证码邮件
 
         Args:
             to_addr: 收件人邮箱
@@ -127,9 +341,134 @@ class EmailUtil:
             subject: 邮件主题
         """
         content = self.load_and_render_template('verification_code.html', {'code': code, 'exp': 10})
-        await self.send_email(
+        return self.build_message(
             to_addrs=[to_addr],
             subject=subject,
             content=content,
             html=True
-        )
\ No newline at end of file
+        )
+
+    async def send_verification_code(self, to_addr: str, code: str, subject: str) -> None:
+        """发送验证码邮件
+
+        Args:
+            to_addr: 收件人邮箱
+            code: 验证码
+            subject: 邮件主题
+        """
+        await self.send_message(self.build_verification_message(to_addr, code, subject))
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        await self.pool.close()
+
+
+class EmailDeliveryQueue:
+    """邮件投递队列
+
+    请求处理中只需将邮件放入队列即可返回，由后台工作协程通过连接池发送，
+    发送失败按指数退避重试，队列满时拒绝入队以形成背压。
+    """
+
+    def __init__(
+        self,
+        email_util: EmailUtil,
+        workers: int = 2,
+        maxsize: int = 1000,
+        max_retries: int = 3,
+        retry_delay: float = 2,
+    ):
+        """初始化投递队列
+
+        Args:
+            email_util: 邮件服务
+            workers: 工作协程数量
+            maxsize: 队列最大长度
+            max_retries: 单封邮件最大重试次数
+            retry_delay: 首次重试等待时间（秒），之后每次翻倍
+        """
+        self.email_util = email_util
+        self.workers = workers
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._metrics = {
+            "enqueued": 0,
+            "sent": 0,
+            "retries": 0,
+            "failed": 0,
+            "rejected": 0,
+        }
+
+    def enqueue(self, msg: MIMEMultipart) -> None:
+        """邮件入队
+
+        Raises:
+            asyncio.QueueFull: 队列已满
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        try:
+            self._queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            self._metrics["rejected"] += 1
+            raise
+        self._metrics["enqueued"] += 1
+
+    async def _deliver(self, msg: MIMEMultipart) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.email_util.send_message(msg)
+                self._metrics["sent"] += 1
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if attempt == self.max_retries:
+                    self._metrics["failed"] += 1
+                    traceback.print_exc()
+                    return
+                self._metrics["retries"] += 1
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+    async def _worker(self) -> None:
+        while True:
+            msg = await self._queue.get()
+            try:
+                await self._deliver(msg)
+            finally:
+                self._queue.task_done()
+
+    def start(self) -> None:
+        """启动工作协程"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """等待队列中的邮件发送完成后停止工作协程，并关闭连接池
+
+        Args:
+            timeout: 最长等待时间（秒）
+        """
+        if self._queue is not None and self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.email_util.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取投递队列统计信息"""
+        return {
+            **self._metrics,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "pool": self.email_util.pool.stats(),
+        }
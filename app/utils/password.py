@@ -0,0 +1,104 @@
+"""密码哈希模块
+
+bcrypt 计算耗时较长，在专用的线程池中执行以免阻塞事件循环。
+bcrypt 计算期间会释放GIL，线程池即可利用多核。
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import bcrypt
+
+
+class PasswordHasher:
+    """密码哈希执行器"""
+
+    def __init__(self, max_workers: int = 4):
+        """初始化执行器
+
+        Args:
+            max_workers: 线程池大小，同时进行的哈希计算不超过该值
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._metrics = {
+            "waiting": 0,
+            "running": 0,
+            "completed": 0,
+            "max_waiting": 0,
+            "total_wait_seconds": 0.0,
+            "total_run_seconds": 0.0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._executor
+
+    async def _run(self, func, *args) -> Any:
+        executor = self._get_executor()
+        metrics = self._metrics
+
+        queued_at = time.monotonic()
+        metrics["waiting"] += 1
+        metrics["max_waiting"] = max(metrics["max_waiting"], metrics["waiting"])
+        acquired = False
+        try:
+            async with self._semaphore:
+                acquired = True
+                metrics["waiting"] -= 1
+                metrics["running"] += 1
+                started = time.monotonic()
+                metrics["total_wait_seconds"] += started - queued_at
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+                finally:
+                    metrics["running"] -= 1
+                    metrics["completed"] += 1
+                    metrics["total_run_seconds"] += time.monotonic() - started
+        finally:
+            # 排队期间被取消
+            if not acquired:
+                metrics["waiting"] -= 1
+
+    @staticmethod
+    def _hash(password: str) -> str:
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+    @staticmethod
+    def _verify(hashed_password: str, password: str) -> bool:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    async def hash(self, password: str) -> str:
+        """获取加密后密码"""
+        return await self._run(self._hash, password)
+
+    async def verify(self, hashed_password: str, password: str) -> bool:
+        """验证加密后的密码"""
+        return await self._run(self._verify, hashed_password, password)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取执行器统计信息，waiting为排队等待的请求数"""
+        completed = self._metrics["completed"]
+        return {
+            **self._metrics,
+            "max_workers": self.max_workers,
+            "avg_wait_seconds": self._metrics["total_wait_seconds"] / completed if completed else 0.0,
+            "avg_run_seconds": self._metrics["total_run_seconds"] / completed if completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """关闭线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+
+# 进程内共享的密码哈希执行器
+password_hasher = PasswordHasher()
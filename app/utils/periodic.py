@@ -0,0 +1,62 @@
+"""周期任务模块
+
+提供在事件循环中按固定间隔执行的后台任务基类，由应用生命周期统一启动和停止。
+"""
+
+import asyncio
+import traceback
+from typing import Optional
+
+
+class PeriodicTask:
+    """周期性后台任务基类
+
+    子类实现 run_once 即可，异常会被打印但不会中断循环。
+    """
+
+    def __init__(self, interval: float):
+        """初始化周期任务
+
+        Args:
+            interval: 执行间隔（秒）
+        """
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """任务是否正在运行"""
+        return self._task is not None and not self._task.done()
+
+    async def run_once(self) -> None:
+        """执行一次任务"""
+        raise NotImplementedError
+
+    async def on_stop(self) -> None:
+        """任务停止后的收尾工作，如刷新缓冲区"""
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                traceback.print_exc()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """启动后台任务"""
+        if not self.running:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """停止后台任务并执行收尾工作"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.on_stop()
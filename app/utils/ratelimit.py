@@ -0,0 +1,56 @@
+"""限流模块
+
+提供按键（如目标邮箱、客户端IP）独立计数的内存令牌桶限流。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+
+class TokenBucketLimiter:
+    """按键限流的令牌桶"""
+
+    def __init__(self, rate: float, capacity: int, max_keys: int = 100000):
+        """初始化限流器
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 令牌桶容量，即允许的突发请求数
+            max_keys: 最多跟踪的键数，超过后淘汰最久未访问的键
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()  # 键: (剩余令牌, 更新时间)
+
+    def allow(self, key: Hashable, cost: float = 1) -> bool:
+        """尝试消耗令牌
+
+        Args:
+            key: 限流键
+            cost: 消耗的令牌数
+
+        Returns:
+            bool: 是否允许本次请求
+        """
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return allowed
+
+    def refund(self, key: Hashable, cost: float = 1) -> None:
+        """归还令牌，用于请求最终未执行的情况"""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets[key] = (min(self.capacity, bucket[0] + cost), bucket[1])
@@ -1,20 +1,30 @@
 """短信服务模块
 
 提供短信发送功能，基于阿里云短信服务。用于验证码、通知等场景。
+短信可通过投递队列批量发送，发送回执由后台任务并发查询投递状态。
+验证码的存储和校验由 VerificationCodeService 统一写入 verification_codes 表。
 """
 
+import asyncio
 import json
 import random
 import string
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+import time
+import traceback
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from alibabacloud_dysmsapi20170525.client import Client
-from alibabacloud_dysmsapi20170525.models import SendSmsRequest, QuerySendDetailsRequest
+from alibabacloud_dysmsapi20170525.models import SendSmsRequest, SendBatchSmsRequest, QuerySendDetailsRequest
 from alibabacloud_tea_openapi.models import Config
 
+from app.utils.periodic import PeriodicTask
+
 class SmsUtil:
     """短信服务类"""
 
+    # SendBatchSms 单次请求最多的手机号数量
+    BATCH_LIMIT = 100
+
     def __init__(
         self,
         access_key_id: str,
@@ -31,15 +41,19 @@ class SmsUtil:
             endpoint: 服务接入点
         """
         self.sign_name = sign_name
-        self.client = Client(
-            Config(
-                access_key_id=access_key_id,
-                access_key_secret=access_key_secret,
-                endpoint=endpoint
-            )
+        self._config = Config(
+            access_key_id=access_key_id,
+            access_key_secret=access_key_secret,
+            endpoint=endpoint
         )
-        # 存储验证码信息，格式为 {phone: (code, expiry_time)}
-        self._verification_codes = {}
+        self._client: Optional[Client] = None
+
+    @property
+    def client(self) -> Client:
+        """阿里云短信客户端，首次使用时创建"""
+        if self._client is None:
+            self._client = Client(self._config)
+        return self._client
 
     async def send_sms(
         self,
@@ -66,11 +80,41 @@ class SmsUtil:
 
         try:
             response = await self.client.send_sms_async(request)
-            return response.body.bizId
+            return response.body.biz_id
         except Exception as e:
             # 这里可以添加更详细的错误处理逻辑
             raise Exception(f"发送短信失败: {str(e)}")
 
+    async def send_batch_sms(
+        self,
+        messages: List[Tuple[str, Optional[Dict[str, str]]]],
+        template_code: str
+    ) -> str:
+        """批量发送同一模板、不同参数的短信
+
+        Args:
+            messages: [(手机号码, 模板参数)]，最多 BATCH_LIMIT 条
+            template_code: 短信模板ID
+
+        Returns:
+            str: 发送回执ID
+        """
+        if len(messages) > self.BATCH_LIMIT:
+            raise ValueError(f"单次最多发送{self.BATCH_LIMIT}条短信")
+
+        request = SendBatchSmsRequest(
+            phone_number_json=json.dumps([phone for phone, _ in messages]),
+            sign_name_json=json.dumps([self.sign_name] * len(messages), ensure_ascii=False),
+            template_code=template_code,
+            template_param_json=json.dumps([param or {} for _, param in messages], ensure_ascii=False)
+        )
+
+        try:
+            response = await self.client.send_batch_sms_async(request)
+            return response.body.biz_id
+        except Exception as e:
+            raise Exception(f"批量发送短信失败: {str(e)}")
+
     async def generate_verification_code(self, length: int = 6) -> str:
         """生成验证码
 
@@ -87,7 +131,6 @@ class SmsUtil:
         phone: str,
         code: Optional[str] = None,
         template_id: str = "VERIFY_CODE",
-        expire_minutes: int = 5
     ) -> str:
         """发送验证码短信
 
@@ -95,7 +138,6 @@ class SmsUtil:
             phone: 手机号码
             code: 验证码，如果为None则自动生成
             template_id: 短信模板ID
-            expire_minutes: 验证码有效期（分钟）
 
         Returns:
             str: 验证码
@@ -103,10 +145,6 @@ class SmsUtil:
         if code is None:
             code = await self.generate_verification_code()
 
-        # 存储验证码和过期时间
-        expiry_time = datetime.now() + timedelta(minutes=expire_minutes)
-        self._verification_codes[phone] = (code, expiry_time)
-
         # 发送验证码短信
         await self.send_sms(
             phone_numbers=[phone],
@@ -116,35 +154,6 @@ class SmsUtil:
 
         return code
 
-    async def verify_code(self, phone: str, code: str) -> bool:
-        """验证短信验证码
-
-        Args:
-            phone: 手机号码
-            code: 用户输入的验证码
-
-        Returns:
-            bool: 验证结果，True为验证通过
-        """
-        if phone not in self._verification_codes:
-            return False
-
-        stored_code, expiry_time = self._verification_codes[phone]
-
-        # 验证码过期检查
-        if datetime.now() > expiry_time:
-            # 删除过期验证码
-            del self._verification_codes[phone]
-            return False
-
-        # 验证码匹配检查
-        if stored_code != code:
-            return False
-
-        # 验证成功后删除验证码
-        del self._verification_codes[phone]
-        return True
-
     async def send_template_message(
         self,
         phone: str,
@@ -190,3 +199,216 @@ class SmsUtil:
             return response.body.to_map()
         except Exception as e:
             raise Exception(f"查询短信状态失败: {str(e)}")
+
+
+class SmsDeliveryQueue:
+    """短信投递队列
+
+    短信入队后立即返回，工作协程将同一模板的短信合并为 SendBatchSms 请求，
+    每批最多 SmsUtil.BATCH_LIMIT 条，发送失败按指数退避重试，发送成功的回执交给状态查询任务跟踪。
+    """
+
+    def __init__(
+        self,
+        sms_util: SmsUtil,
+        status_poller: Optional["SmsStatusPoller"] = None,
+        maxsize: int = 10000,
+        max_delay: float = 0.2,
+        max_retries: int = 3,
+        retry_delay: float = 2,
+        on_failed: Optional[Callable[[str, str], None]] = None,
+    ):
+        """初始化投递队列
+
+        Args:
+            sms_util: 短信服务
+            status_poller: 发送状态查询任务
+            maxsize: 队列最大长度
+            max_delay: 凑批的最长等待时间（秒）
+            max_retries: 单批最大重试次数
+            retry_delay: 首次重试等待时间（秒），之后每次翻倍
+            on_failed: 重试耗尽或停止时仍未发出的短信的回调，参数为 (手机号, 模板ID)
+        """
+        self.sms_util = sms_util
+        self.status_poller = status_poller
+        self.maxsize = maxsize
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.on_failed = on_failed
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._metrics = {"enqueued": 0, "sent": 0, "requests": 0, "retries": 0, "failed": 0, "rejected": 0}
+
+    def enqueue(self, phone: str, template_code: str, template_param: Optional[Dict[str, str]] = None) -> None:
+        """短信入队
+
+        Raises:
+            asyncio.QueueFull: 队列已满
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        try:
+            self._queue.put_nowait((phone, template_code, template_param))
+        except asyncio.QueueFull:
+            self._metrics["rejected"] += 1
+            raise
+        self._metrics["enqueued"] += 1
+
+    async def _collect(self) -> List[Tuple[str, str, Optional[Dict[str, str]]]]:
+        """取出一批短信：拿到第一条后在 max_delay 内尽量凑满"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.sms_util.BATCH_LIMIT:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _fail(self, template_code: str, messages: List[Tuple[str, Optional[Dict[str, str]]]]) -> None:
+        self._metrics["failed"] += len(messages)
+        if self.on_failed is not None:
+            for phone, _ in messages:
+                self.on_failed(phone, template_code)
+
+    async def _send(self, template_code: str, messages: List[Tuple[str, Optional[Dict[str, str]]]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            self._metrics["requests"] += 1
+            try:
+                biz_id = await self.sms_util.send_batch_sms(messages, template_code)
+                break
+            except asyncio.CancelledError:
+                self._fail(template_code, messages)
+                raise
+            except Exception:
+                if attempt == self.max_retries:
+                    self._fail(template_code, messages)
+                    traceback.print_exc()
+                    return
+                self._metrics["retries"] += 1
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+        self._metrics["sent"] += len(messages)
+        if self.status_poller is not None and biz_id:
+            for phone, _ in messages:
+                self.status_poller.track(biz_id, phone)
+
+    async def _worker(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                # 按模板分组，每组一个请求
+                groups: Dict[str, List[Tuple[str, Optional[Dict[str, str]]]]] = {}
+                for phone, template_code, template_param in batch:
+                    groups.setdefault(template_code, []).append((phone, template_param))
+                await asyncio.gather(*(self._send(code, messages) for code, messages in groups.items()))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def start(self) -> None:
+        """启动工作协程"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        if self._task is None:
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self, timeout: float = 10) -> None:
+        """等待队列中的短信发送完成后停止
+
+        Args:
+            timeout: 最长等待时间（秒）
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """获取投递队列统计信息"""
+        return {**self._metrics, "queued": self._queue.qsize() if self._queue is not None else 0}
+
+
+class SmsStatusPoller(PeriodicTask):
+    """短信发送状态查询任务
+
+    定时并发查询所有未确定状态的发送回执，状态确定（成功或失败）或超过 max_age 后不再跟踪。
+    """
+
+    # 阿里云 SendStatus: 1-等待回执 2-发送失败 3-发送成功
+    STATUS_WAITING = 1
+
+    def __init__(
+        self,
+        sms_util: SmsUtil,
+        interval: float = 15,
+        concurrency: int = 10,
+        max_age: float = 3600,
+        on_result: Optional[Callable[[str, str, Dict], None]] = None,
+    ):
+        """初始化状态查询任务
+
+        Args:
+            sms_util: 短信服务
+            interval: 查询间隔（秒）
+            concurrency: 同时进行的查询请求数
+            max_age: 回执的最长跟踪时间（秒）
+            on_result: 状态确定后的回调，参数为 (回执ID, 手机号, 发送详情)
+        """
+        super().__init__(interval)
+        self.sms_util = sms_util
+        self.concurrency = concurrency
+        self.max_age = max_age
+        self.on_result = on_result
+        self._pending: Dict[Tuple[str, str], float] = {}  # (回执ID, 手机号): 开始跟踪时间
+        self._metrics = {"delivered": 0, "failed": 0, "expired": 0, "query_errors": 0}
+
+    def track(self, biz_id: str, phone: str) -> None:
+        """跟踪一条短信的发送状态"""
+        self._pending.setdefault((biz_id, phone), time.monotonic())
+
+    async def _query(self, semaphore: asyncio.Semaphore, biz_id: str, phone: str) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                result = await self.sms_util.query_send_status(biz_id, phone)
+            except Exception:
+                self._metrics["query_errors"] += 1
+                return None
+        details = (result.get("SmsSendDetailDTOs") or {}).get("SmsSendDetailDTO") or []
+        return details[0] if details else None
+
+    async def run_once(self) -> None:
+        """并发查询所有待确定状态的回执"""
+        if not self._pending:
+            return
+
+        now = time.monotonic()
+        keys = list(self._pending)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        details = await asyncio.gather(*(self._query(semaphore, biz_id, phone) for biz_id, phone in keys))
+
+        for key, detail in zip(keys, details):
+            status = detail.get("SendStatus") if detail else None
+            if status is None or status == self.STATUS_WAITING:
+                if now - self._pending[key] > self.max_age:
+                    del self._pending[key]
+                    self._metrics["expired"] += 1
+                continue
+
+            del self._pending[key]
+            self._metrics["delivered" if status == 3 else "failed"] += 1
+            if self.on_result is not None:
+                self.on_result(key[0], key[1], detail)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取状态查询统计信息"""
+        return {**self._metrics, "pending": len(self._pending)}
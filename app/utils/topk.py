@@ -0,0 +1,79 @@
+"""高频项统计模块
+
+使用 Space-Saving 算法在固定内存内近似统计数据流中出现次数最多的前K项。
+"""
+
+import heapq
+from typing import Dict, Hashable, List, Tuple
+
+
+class SpaceSaving:
+    """Space-Saving 高频项统计
+
+    最多跟踪 capacity 个项，新项到来且已满时替换计数最小的项并继承其计数，
+    被跟踪项的计数误差不超过被替换时的最小计数。
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """初始化统计
+
+        Args:
+            capacity: 最多跟踪的项数，应远大于需要查询的K
+        """
+        self.capacity = capacity
+        self._counts: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, Hashable]] = []  # (计数, 项) 最小堆，允许存在过期条目
+        self._top_cache: List[Tuple[Hashable, int]] = []
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        """累加一项的计数"""
+        if item in self._counts:
+            self._counts[item] += count
+        elif len(self._counts) < self.capacity:
+            self._counts[item] = count
+        else:
+            # 替换当前计数最小的项
+            min_count, min_item = self._pop_min()
+            del self._counts[min_item]
+            self._counts[item] = min_count + count
+
+        heapq.heappush(self._heap, (self._counts[item], item))
+        self._dirty = True
+
+        # 过期条目过多时重建堆
+        if len(self._heap) > self.capacity * 4:
+            self._heap = [(c, i) for i, c in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, Hashable]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self._counts.get(item) == count:
+                return count, item
+
+    def discard(self, item: Hashable) -> None:
+        """移除一项"""
+        if self._counts.pop(item, None) is not None:
+            self._dirty = True
+
+    def top(self, k: int) -> List[Tuple[Hashable, int]]:
+        """获取计数最高的前k项
+
+        Returns:
+            List: [(项, 计数)] 按计数倒序
+        """
+        if self._dirty or len(self._top_cache) < min(k, len(self._counts)):
+            self._top_cache = heapq.nlargest(max(k, len(self._top_cache)), self._counts.items(), key=lambda x: x[1])
+            self._dirty = False
+        return self._top_cache[:k]
+
+    def clear(self) -> None:
+        """清空统计"""
+        self._counts.clear()
+        self._heap.clear()
+        self._top_cache = []
+        self._dirty = False
@@ -0,0 +1,84 @@
+"""认证开销基准
+
+测量每个请求在 get_optional_user_id 上的开销：令牌缓存命中，与未命中时查询 user_tokens
+（相当于改造前每个请求都查库）。数据库会话用替身代替，查询耗时用 --db-latency-ms 模拟，不需要MySQL。
+
+运行: python -m benchmarks.bench_auth [--requests 20000] [--db-latency-ms 0.5]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from starlette.requests import Request
+
+from app.core import auth
+
+TOKEN = "3f6c0a9e8b7d4c2a9e1f5b6d7c8a9b0c"
+
+
+class StubSession:
+    """模拟一次 user_tokens 主键查询的会话替身"""
+
+    queries = 0
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, query):
+        StubSession.queries += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        row = SimpleNamespace(user_id=42, access_expires_at=datetime.utcnow() + timedelta(hours=1))
+        return SimpleNamespace(first=lambda: row)
+
+
+def make_request() -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/prompt/recommend",
+        "headers": [(b"authorization", f"Bearer {TOKEN}".encode())],
+    })
+
+
+async def measure(requests: int, clear_cache: bool) -> float:
+    request = make_request()
+    started = time.perf_counter()
+    for _ in range(requests):
+        if clear_cache:
+            auth.token_cache.invalidate(TOKEN)
+        assert await auth.get_optional_user_id(request) == 42
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="认证开销基准")
+    parser.add_argument("--requests", type=int, default=20000, help="每种情况的请求数")
+    parser.add_argument("--db-latency-ms", type=float, default=0.5, help="模拟的单次查询耗时（毫秒）")
+    args = parser.parse_args()
+
+    latency = args.db_latency_ms / 1000
+    auth.SessionLocal = lambda: StubSession(latency)
+
+    async def run():
+        miss = await measure(max(1, args.requests // 20), clear_cache=True)
+        hit = await measure(args.requests, clear_cache=False)
+        return miss, hit
+
+    miss, hit = asyncio.run(run())
+    print(f"缓存未命中（每次查询 user_tokens，模拟查询 {args.db_latency_ms}ms）: {miss:>9.1f} us/请求")
+    print(f"缓存命中:                                            {hit:>9.1f} us/请求")
+    print(f"命中时每请求节省 {miss - hit:.1f} us，查询次数 {StubSession.queries}")
+
+
+if __name__ == "__main__":
+    main()
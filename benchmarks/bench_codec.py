@@ -0,0 +1,51 @@
+"""提示词内容解码基准
+
+比较 content 字段几种解码方式每KB的耗时：
+JSON 格式用 codec.loads（orjson），旧的 Python 字面量格式用 codec.loads（回退到 ast.literal_eval）、
+直接 ast.literal_eval 以及改造前的 eval。
+
+运行: python -m benchmarks.bench_codec
+"""
+
+import ast
+import timeit
+
+from app.utils import codec
+
+
+def make_content(turns: int) -> list:
+    """生成 turns 轮对话的提示词内容，中英文混合"""
+    return [
+        {
+            "role": "user" if i % 2 else "system",
+            "content": f"第{i}轮：你是一名资深翻译，请将下面的内容翻译为英文并保留术语。Keep the tone formal. " * 4,
+        }
+        for i in range(turns)
+    ]
+
+
+def us_per_kb(func, text: str, number: int) -> float:
+    seconds = min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number
+    return seconds * 1e6 / (len(text.encode("utf-8")) / 1024)
+
+
+def main() -> None:
+    print(f"{'大小':>8} {'codec.loads(JSON)':>18} {'codec.loads(旧格式)':>20} {'ast.literal_eval':>17} {'eval':>10}  (us/KB)")
+    for turns in (4, 40, 400):
+        content = make_content(turns)
+        json_text = codec.dumps(content)
+        legacy_text = repr(content)
+        number = max(10, 20000 // turns)
+
+        results = (
+            us_per_kb(codec.loads, json_text, number),
+            us_per_kb(codec.loads, legacy_text, number),
+            us_per_kb(ast.literal_eval, legacy_text, number),
+            us_per_kb(eval, legacy_text, number),
+        )
+        size = f"{len(legacy_text.encode('utf-8')) / 1024:.1f}KB"
+        print(f"{size:>8} {results[0]:>18.2f} {results[1]:>20.2f} {results[2]:>17.2f} {results[3]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
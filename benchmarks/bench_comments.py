@@ -0,0 +1,138 @@
+"""评论列表回复查询基准
+
+在 SQLite 中生成一个提示词下 10万条评论（根评论 + 回复），建立与 MySQL 相同列序的 idx_prompt_root_created，
+对第一页根评论比较两种取回复的方式：
+改造前对所有回复计算 ROW_NUMBER() / COUNT() OVER 后再过滤前N条，
+与现在每条根评论单独 LIMIT 后 UNION ALL、回复数单独按索引 COUNT。不需要MySQL。
+
+运行: python -m benchmarks.bench_comments [--comments 100000] [--roots 200]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import aliased
+
+from app.models import PromptComments
+from app.services.prompt.comment import PromptCommentService
+
+PROMPT_ID = 7
+
+
+async def window_replies(db, root_ids, reply_limit):
+    """改造前的窗口函数查询"""
+    parent = aliased(PromptComments)
+    replies = select(
+        PromptComments.id,
+        PromptComments.user_id,
+        PromptComments.root_id,
+        PromptComments.parent_id,
+        PromptComments.content,
+        PromptComments.likes_count,
+        PromptComments.created_at,
+        parent.user_id.label("parent_user_id"),
+        func.row_number().over(
+            partition_by=PromptComments.root_id,
+            order_by=(PromptComments.created_at, PromptComments.id)
+        ).label("row_number"),
+        func.count().over(partition_by=PromptComments.root_id).label("reply_count"),
+    ).outerjoin(
+        parent, parent.id == PromptComments.parent_id
+    ).where(
+        PromptComments.prompt_id == PROMPT_ID,
+        PromptComments.root_id.in_(root_ids),
+        PromptComments.is_deleted == 0
+    ).subquery()
+    query = select(replies).where(
+        replies.c.row_number <= reply_limit
+    ).order_by(replies.c.root_id, replies.c.row_number)
+    return (await db.execute(query)).all()
+
+
+async def bounded_replies(db, root_ids, reply_limit):
+    service = PromptCommentService(db)
+    counts = await service._get_reply_counts(PROMPT_ID, root_ids)
+    return await service._get_top_replies(PROMPT_ID, [root_id for root_id in root_ids if counts.get(root_id)], reply_limit)
+
+
+async def populate(engine, comments: int, roots: int, seed: int = 42):
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    columns = ", ".join(column.name for column in PromptComments.__table__.columns)
+    rows = []
+    for comment_id in range(1, roots + 1):
+        rows.append({"id": comment_id, "root_id": 0, "parent_id": 0})
+    for comment_id in range(roots + 1, comments + 1):
+        # 热门根评论（ID越大越新，排在第一页）集中了大部分回复
+        root_id = roots - min(int(rng.expovariate(1 / (roots / 10))), roots - 1)
+        rows.append({"id": comment_id, "root_id": root_id, "parent_id": root_id if rng.random() < 0.5 else comment_id - 1})
+    for row in rows:
+        row.update({
+            "user_id": row["id"] % 500, "prompt_id": PROMPT_ID, "content": "评论内容" * 5, "likes_count": 0,
+            "created_at": started + timedelta(seconds=row["id"]), "is_deleted": int(row["id"] % 50 == 0),
+        })
+    async with engine.begin() as conn:
+        await conn.execute(text(f"CREATE TABLE prompt_comments ({columns})"))
+        await conn.execute(text(
+            "CREATE INDEX idx_prompt_root_created ON prompt_comments (prompt_id, root_id, is_deleted, created_at, id)"
+        ))
+        await conn.execute(text("CREATE UNIQUE INDEX pk_id ON prompt_comments (id)"))
+        await conn.execute(PromptComments.__table__.insert(), rows)
+        await conn.execute(text("ANALYZE"))
+
+
+async def per_call_ms(func, session, root_ids, reply_limit, number):
+    best = None
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(number):
+            await func(session, root_ids, reply_limit)
+        elapsed = (time.perf_counter() - started) / number * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+async def run(args):
+    path = os.path.join(tempfile.mkdtemp(), "comments.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    try:
+        started = time.perf_counter()
+        await populate(engine, args.comments, args.roots)
+        print(f"生成 {args.comments} 条评论（{args.roots} 条根评论）耗时 {time.perf_counter() - started:.1f} s")
+
+        root_ids = list(range(args.roots, args.roots - args.page_size, -1))
+        async with async_sessionmaker(engine)() as session:
+            old = await window_replies(session, root_ids, args.reply_limit)
+            new = await bounded_replies(session, root_ids, args.reply_limit)
+            assert [row.id for row in old] == [row.id for row in new]
+            replies = (await session.execute(
+                select(func.count()).where(PromptComments.root_id.in_(root_ids), PromptComments.is_deleted == 0)
+            )).scalar()
+
+            print(f"第一页 {args.page_size} 条根评论共 {replies} 条回复，每条取前 {args.reply_limit} 条")
+            print(f"{'方式':<30} {'ms/次':>8}")
+            for name, func_ in (("ROW_NUMBER/COUNT OVER", window_replies), ("UNION ALL LIMIT + 索引COUNT", bounded_replies)):
+                print(f"{name:<30} {await per_call_ms(func_, session, root_ids, args.reply_limit, args.number):>8.2f}")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="评论列表回复查询基准")
+    parser.add_argument("--comments", type=int, default=100000, help="评论总数")
+    parser.add_argument("--roots", type=int, default=200, help="根评论数")
+    parser.add_argument("--page-size", type=int, default=20, help="每页根评论数")
+    parser.add_argument("--reply-limit", type=int, default=3, help="每条根评论附带的回复数")
+    parser.add_argument("--number", type=int, default=10, help="每轮调用次数")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""邮件模板渲染基准
+
+比较验证码邮件模板的渲染速度：
+改造前每次渲染都检查文件存在、读取文件并逐个 str.replace 占位符；
+现在的 EmailUtil.load_and_render_template 使用按修改时间缓存的预编译 EmailTemplate。
+同时给出只计 EmailTemplate.render 的速度。不需要SMTP服务器和数据库。
+
+运行: python -m benchmarks.bench_email_template
+"""
+
+import timeit
+from pathlib import Path
+
+from app.utils.email import EmailUtil
+
+TEMPLATES_DIR = Path("data/templates/email")
+TEMPLATE_NAME = "verification_code.html"
+CONTEXT = {"code": "482913", "exp": 10}
+
+
+def legacy_render(template_name: str, context: dict) -> str:
+    """改造前的实现：每次读取文件并逐个替换占位符"""
+    template_path = TEMPLATES_DIR / template_name
+    if not template_path.exists():
+        raise FileNotFoundError(f"Template not found: {template_name}")
+
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template = f.read()
+
+    for key, value in context.items():
+        template = template.replace(f"{{{key}}}", str(value))
+    return template
+
+
+def renders_per_second(func, number: int = 20000) -> float:
+    return number / min(timeit.repeat(func, number=number, repeat=5))
+
+
+def main() -> None:
+    email_util = EmailUtil("127.0.0.1", 25, "noreply@example.com", "", templates_dir=str(TEMPLATES_DIR))
+    template = email_util.load_template(TEMPLATE_NAME)
+    assert template.render(CONTEXT) == legacy_render(TEMPLATE_NAME, CONTEXT)
+
+    results = [
+        ("读取文件 + str.replace（改造前）", renders_per_second(lambda: legacy_render(TEMPLATE_NAME, CONTEXT))),
+        ("load_and_render_template", renders_per_second(lambda: email_util.load_and_render_template(TEMPLATE_NAME, CONTEXT))),
+        ("EmailTemplate.render", renders_per_second(lambda: template.render(CONTEXT))),
+    ]
+    baseline = results[0][1]
+    for name, rate in results:
+        print(f"{name:<34} {rate:>12,.0f} 次/秒  {rate / baseline:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""登录风暴负载测试
+
+模拟 N 个并发登录同时校验密码，比较两种方式下事件循环的响应延迟：
+改造前在协程中直接调用 bcrypt.checkpw，与现在通过 password_hasher 在线程池中计算。
+探测协程不断 await asyncio.sleep(0) 并记录每次被重新调度的间隔，
+间隔即其他请求在这段时间内无法得到处理的时长。不需要MySQL。
+
+运行: python -m benchmarks.bench_password [--logins 32] [--rounds 10]
+"""
+
+import argparse
+import asyncio
+import time
+
+import bcrypt
+
+from app.utils.password import PasswordHasher
+
+PASSWORD = "correct horse battery staple"
+
+
+async def probe(stop: asyncio.Event, lags: list) -> None:
+    """记录事件循环两次调度探测协程的间隔"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+        lags.append(time.perf_counter() - started)
+
+
+async def storm(verify, logins: int) -> dict:
+    stop = asyncio.Event()
+    lags: list = []
+    probe_task = asyncio.create_task(probe(stop, lags))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(logins)))
+    seconds = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    assert all(results)
+
+    lags.sort()
+    return {
+        "seconds": seconds,
+        "p99_lag_ms": lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000,
+        "max_lag_ms": lags[-1] * 1000,
+        "probes": len(lags),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="登录风暴下的事件循环延迟")
+    parser.add_argument("--logins", type=int, default=32, help="并发登录数")
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt 成本因子")
+    parser.add_argument("--workers", type=int, default=4, help="password_hasher 线程池大小")
+    args = parser.parse_args()
+
+    hashed = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=args.rounds)).decode("utf-8")
+    hasher = PasswordHasher(max_workers=args.workers)
+
+    async def inline_verify() -> bool:
+        # 改造前：在事件循环线程中直接计算
+        return bcrypt.checkpw(PASSWORD.encode("utf-8"), hashed.encode("utf-8"))
+
+    async def pooled_verify() -> bool:
+        return await hasher.verify(hashed, PASSWORD)
+
+    async def run():
+        return await storm(inline_verify, args.logins), await storm(pooled_verify, args.logins)
+
+    try:
+        inline, pooled = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+
+    print(f"{args.logins} 个并发登录，bcrypt rounds={args.rounds}，线程池 {args.workers}")
+    print(f"{'方式':<22} {'总耗时(s)':>10} {'p99延迟(ms)':>12} {'最大延迟(ms)':>13} {'探测次数':>9}")
+    for name, result in (("协程内 bcrypt.checkpw", inline), ("password_hasher", pooled)):
+        print(
+            f"{name:<22} {result['seconds']:>10.2f} {result['p99_lag_ms']:>12.2f} "
+            f"{result['max_lag_ms']:>13.2f} {result['probes']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
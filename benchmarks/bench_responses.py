@@ -0,0 +1,92 @@
+"""JSON响应编码基准
+
+比较改造前的 JSONResponse.render（标准库 json）与 FastJSONResponse.render（orjson）
+在接近真实的响应上的耗时：15条的推荐页和含中文正文的提示词内容。
+
+运行: python -m benchmarks.bench_responses
+"""
+
+import timeit
+
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse
+
+
+def envelope(data) -> dict:
+    return {"code": 200, "msg": "成功", "data": data}
+
+
+def recommend_page() -> dict:
+    """与 PromptRecommendService.format_prompts 结构相同的一页推荐"""
+    return envelope({
+        "items": [
+            {
+                "id": 1000 + i,
+                "type": 1,
+                "cover_image": f"https://cdn.lextrade.cn/prompt/cover/{1000 + i}.png",
+                "title": f"小红书爆款文案生成器 第{i}版",
+                "summary_content": "输入产品卖点和目标人群，自动生成带表情符号和话题标签的种草文案，支持多种语气风格。" * 2,
+                "like_count": 1200 + i,
+                "view_count": 56000 - i * 100,
+                "author": {
+                    "id": 200 + i,
+                    "nickname": f"提示词工匠{i}",
+                    "avatar_url": f"https://cdn.lextrade.cn/avatar/{200 + i}.jpg",
+                    "relation": {"is_followed": i % 3 == 0},
+                },
+                "is_liked": i % 2 == 0,
+                "is_favorited": i % 5 == 0,
+            }
+            for i in range(15)
+        ],
+        "next_cursor": "eyJ2IjpbNTQ2MDAsIjIwMjQtMDUtMDFUMDg6MzA6MDAiLDEwMTRdfQ",
+    })
+
+
+def content_payload() -> dict:
+    """与 PromptContentService.get_prompt_content 结构相同的提示词内容"""
+    return envelope({
+        "id": 1001,
+        "type": 1,
+        "images": [f"https://cdn.lextrade.cn/prompt/1001/{i}.png" for i in range(6)],
+        "title": "资深中英翻译助手",
+        "tags": ["翻译", "英语", "写作", "职场"],
+        "content": [
+            {"role": "system", "content": "你是一名资深的中英翻译，熟悉法律、金融和技术文档的术语。翻译时保留原文格式，专有名词首次出现时附注原文。" * 8},
+            {"role": "user", "content": "请把下面这段产品说明翻译成英文：{input}"},
+            {"role": "assistant", "content": "好的，请提供需要翻译的内容，我会先给出直译，再给出润色后的版本。" * 4},
+        ],
+        "counts": {"comment": 32, "view": 56789, "like": 1234, "favorite": 567},
+        "author": {
+            "id": 201,
+            "nickname": "提示词工匠",
+            "avatar_url": "https://cdn.lextrade.cn/avatar/201.jpg",
+            "bio": "专注翻译和写作类提示词",
+            "relation": {"is_followed": True},
+        },
+        "is_liked": True,
+        "is_favorited": False,
+        "created_at": "2024-05-01 08:30:00",
+        "updated_at": "2024-06-12 21:04:11",
+    })
+
+
+def per_call_us(func, number: int = 5000) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    stdlib = JSONResponse(content=None)
+    fast = FastJSONResponse(content=None)
+
+    print(f"{'响应':<14} {'大小':>8} {'JSONResponse':>14} {'FastJSONResponse':>18} {'加速':>7}  (us/次)")
+    for name, payload in (("推荐页(15条)", recommend_page()), ("提示词内容", content_payload())):
+        size = len(fast.render(payload))
+        baseline = per_call_us(lambda: stdlib.render(payload))
+        optimized = per_call_us(lambda: fast.render(payload))
+        print(f"{name:<14} {size / 1024:>6.1f}KB {baseline:>14.1f} {optimized:>18.1f} {baseline / optimized:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
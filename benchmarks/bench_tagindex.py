@@ -0,0 +1,68 @@
+"""标签自动补全索引基准
+
+用10万个中英文混合的合成标签名构建 TagIndex，统计构建耗时，
+并分别测量单字、二字和更长关键词的 search() 耗时，
+与逐个名称做子串匹配后排序的线性扫描（相当于改造前的 LIKE '%kw%' + ORDER BY）对比。
+
+运行: python -m benchmarks.bench_tagindex [--tags 100000]
+"""
+
+import argparse
+import heapq
+import random
+import time
+import timeit
+from datetime import datetime, timedelta
+
+from app.services.prompt.tagindex import TagEntry, TagIndex
+
+CHINESE = "写作翻译编程绘画营销设计教育法律医疗金融游戏音乐视频摄影旅行美食健身心理职场面试简历小说诗歌论文数据分析产品运营客服"
+LATIN = ["python", "java", "sql", "midjourney", "seo", "copy", "chat", "code", "review", "email", "excel", "prompt"]
+
+
+def make_entries(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    entries = {}
+    for tag_id in range(1, count + 1):
+        parts = ["".join(rng.choices(CHINESE, k=rng.randint(2, 4)))]
+        if rng.random() < 0.4:
+            parts.append(rng.choice(LATIN))
+        name = "".join(parts) + str(tag_id % 97)
+        entries[tag_id] = TagEntry(tag_id, name, rng.randint(0, 100000), started + timedelta(minutes=tag_id))
+    return entries
+
+
+def linear_search(entries, keyword: str, page_size: int = 10):
+    """逐个名称子串匹配后取前 page_size 个，模拟数据库的全表扫描"""
+    keyword = keyword.lower()
+    matched = [entry for entry in entries.values() if keyword in entry.lower_name]
+    return len(matched), heapq.nsmallest(page_size, matched, key=lambda entry: entry.rank_key)
+
+
+def per_call_ms(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="标签自动补全索引基准")
+    parser.add_argument("--tags", type=int, default=100000, help="合成标签数量")
+    args = parser.parse_args()
+
+    entries = make_entries(args.tags)
+    index = TagIndex()
+    started = time.perf_counter()
+    index._build(entries)
+    print(f"构建 {args.tags} 个标签的索引耗时 {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    print(f"{'关键词':<12} {'匹配数':>8} {'TagIndex.search':>16} {'线性扫描':>10}  (ms/次)")
+    for keyword in ("写", "翻译", "py", "数据分析", "营销copy", "midjourney", "不存在的词"):
+        total = index.search(keyword)["total"]
+        assert total == linear_search(entries, keyword)[0]
+        indexed = per_call_ms(lambda: index.search(keyword), 20)
+        scanned = per_call_ms(lambda: linear_search(entries, keyword), 3)
+        print(f"{keyword:<12} {total:>8} {indexed:>16.3f} {scanned:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
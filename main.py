@@ -7,6 +7,7 @@ import importlib.util
 from app.core.lifecycle import lifespan
 from app.core.exceptions import setup_exception_handlers
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
 
 app = FastAPI(
     title="LexTrade API",
@@ -14,6 +15,7 @@ app = FastAPI(
     version="0.1.0",
     lifespan=lifespan,
     debug=settings.DEBUG,
+    default_response_class=FastJSONResponse,
 
     docs_url=settings.DEBUG and "/docs" or None,
     redoc_url=settings.DEBUG and "/redoc" or None,
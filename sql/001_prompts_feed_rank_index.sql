@@ -0,0 +1,5 @@
+-- 推荐流排序索引
+-- /prompt/recommend 按 (view_count, created_at, id) 倒序做键集分页，
+-- 过滤条件 status、is_deleted 在前，避免全表排序
+ALTER TABLE `prompts`
+    ADD INDEX `idx_feed_rank` (`status`, `is_deleted`, `view_count`, `created_at`, `id`);
@@ -0,0 +1,23 @@
+-- 用户浏览记录主键改为 (user_id, prompt_id)
+-- 浏览量缓冲使用 INSERT ... ON DUPLICATE KEY UPDATE 批量写回浏览时间，
+-- 依赖该唯一键判断同一用户对同一提示词的浏览记录是否已存在。
+-- 重建表并合并重复记录，保留最新的浏览时间。
+
+CREATE TABLE `user_view_prompts_new` (
+    `user_id` BIGINT NOT NULL COMMENT '用户ID',
+    `prompt_id` BIGINT NOT NULL COMMENT '提示词ID',
+    `view_at` TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP COMMENT '浏览时间',
+    PRIMARY KEY (`user_id`, `prompt_id`),
+    KEY `idx_prompt_id` (`prompt_id`)
+) COMMENT='用户浏览提示词记录表';
+
+INSERT INTO `user_view_prompts_new` (`user_id`, `prompt_id`, `view_at`)
+SELECT `user_id`, `prompt_id`, MAX(`view_at`)
+FROM `user_view_prompts`
+GROUP BY `user_id`, `prompt_id`;
+
+RENAME TABLE `user_view_prompts` TO `user_view_prompts_old`,
+             `user_view_prompts_new` TO `user_view_prompts`;
+
+-- 确认数据无误后删除旧表
+-- DROP TABLE `user_view_prompts_old`;
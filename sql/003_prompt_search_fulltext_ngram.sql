@@ -0,0 +1,6 @@
+-- 提示词全文索引改用 ngram 分词
+-- 默认的全文解析器按空格和标点分词，无法切分中文，MATCH ... AGAINST 对中文关键词几乎匹配不到结果。
+-- ngram 分词长度由服务器参数 ngram_token_size 决定（默认2），需在 my.cnf 中设置并重启后生效。
+ALTER TABLE `prompts`
+    DROP INDEX `ft_content_search`,
+    ADD FULLTEXT INDEX `ft_content_search` (`title`, `summary_content`, `content`) WITH PARSER ngram;
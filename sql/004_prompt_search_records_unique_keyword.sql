@@ -0,0 +1,25 @@
+-- 搜索关键词唯一键
+-- 搜索记录缓冲使用 INSERT ... ON DUPLICATE KEY UPDATE 累加搜索次数，多个进程同时写入同一新关键词时依赖该唯一键去重。
+-- 先合并已有的重复关键词：保留最小ID，累加搜索次数，隐藏状态优先保留。
+
+UPDATE `prompt_search_records` r
+JOIN (
+    SELECT MIN(`id`) AS `keep_id`,
+           SUM(`search_count`) AS `total_count`,
+           MIN(`created_at`) AS `first_at`,
+           MAX(`updated_at`) AS `last_at`,
+           MAX(`status`) AS `merged_status`
+    FROM `prompt_search_records`
+    GROUP BY `keyword`
+    HAVING COUNT(*) > 1
+) d ON r.`id` = d.`keep_id`
+SET r.`search_count` = d.`total_count`,
+    r.`created_at` = d.`first_at`,
+    r.`updated_at` = d.`last_at`,
+    r.`status` = d.`merged_status`;
+
+DELETE r FROM `prompt_search_records` r
+JOIN `prompt_search_records` k ON r.`keyword` = k.`keyword` AND r.`id` > k.`id`;
+
+ALTER TABLE `prompt_search_records`
+    ADD UNIQUE INDEX `uk_keyword` (`keyword`);
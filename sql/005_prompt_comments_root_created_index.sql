@@ -0,0 +1,5 @@
+-- 评论分页索引
+-- 根评论列表按 (prompt_id, root_id=0) 过滤并按 (created_at, id) 倒序键集分页，
+-- 回复列表按 (prompt_id, root_id) 过滤并正序分页，每条根评论的前N条回复也按该顺序取，均无需排序。
+ALTER TABLE `prompt_comments`
+    ADD INDEX `idx_prompt_root_created` (`prompt_id`, `root_id`, `created_at`, `id`);
@@ -0,0 +1,6 @@
+-- 评论分页索引加入 is_deleted
+-- 查询均以 is_deleted = 0 等值过滤，放在 created_at 之前不影响按 (created_at, id) 有序读取；
+-- 每条根评论的回复数 COUNT(*) ... WHERE prompt_id = ? AND root_id IN (...) AND is_deleted = 0 只扫描索引不回表。
+ALTER TABLE `prompt_comments`
+    DROP INDEX `idx_prompt_root_created`,
+    ADD INDEX `idx_prompt_root_created` (`prompt_id`, `root_id`, `is_deleted`, `created_at`, `id`);
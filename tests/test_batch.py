@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.utils.batch import InsertBatcher
+
+items = Table("items", MetaData(), Column("id", Integer, primary_key=True), Column("name", String(20), nullable=False))
+
+
+def _run(tmp_path, batcher_kwargs, rows):
+    """并发写入 rows，返回 (各调用方结果, 表中行数, 合并统计)"""
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'batch.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(items.create)
+        batcher = InsertBatcher(async_sessionmaker(engine), items, **batcher_kwargs)
+        try:
+            results = await asyncio.gather(*(batcher.add(row) for row in rows), return_exceptions=True)
+            async with engine.connect() as conn:
+                count = (await conn.execute(select(func.count()).select_from(items))).scalar()
+            return results, count, batcher.stats()
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_rows_coalesce_into_one_insert(tmp_path):
+    results, count, stats = _run(tmp_path, {}, [{"name": f"row{i}"} for i in range(50)])
+    assert results == [None] * 50
+    assert count == 50
+    assert stats["batches"] == 1
+    assert stats["pending"] == 0
+
+
+def test_full_batches_flush_without_waiting(tmp_path):
+    results, count, stats = _run(tmp_path, {"max_batch": 10, "max_delay": 60}, [{"name": f"row{i}"} for i in range(20)])
+    assert results == [None] * 20
+    assert count == 20
+    assert stats["batches"] == 2
+
+
+def test_failed_batch_raises_in_every_caller(tmp_path):
+    rows = [{"name": "ok"}, {"name": None}, {"name": "ok"}]
+    results, count, stats = _run(tmp_path, {}, rows)
+    assert len(results) == 3
+    assert all(isinstance(result, Exception) for result in results)
+    assert count == 0
+    assert stats["errors"] == 1
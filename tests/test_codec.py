@@ -0,0 +1,20 @@
+from app.utils import codec
+
+CONTENT = {
+    "title": "提示词标题",
+    "content": [{"role": "system", "content": "你是一名资深翻译。" * 20}, {"role": "user", "content": "{input}"}],
+    "images": [f"https://cdn.example.com/prompt/{i}.png" for i in range(10)],
+    "tags": list(range(20)),
+}
+
+
+def test_round_trip_keeps_unicode():
+    text = codec.dumps(CONTENT)
+    assert "提示词标题" in text
+    assert codec.loads(text) == CONTENT
+
+
+def test_loads_legacy_literal():
+    assert codec.loads(repr(CONTENT)) == CONTENT
+    assert codec.loads("", default=[]) == []
+
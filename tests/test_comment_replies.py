@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import PromptComments, Users
+from app.services.prompt.comment import PromptCommentService
+
+
+def _untyped_ddl(table) -> str:
+    # 模型使用MySQL类型，SQLite中建无类型列即可
+    return f"CREATE TABLE {table.name} ({', '.join(column.name for column in table.columns)})"
+
+
+def test_comments_carry_top_replies_and_counts(tmp_path):
+    started = datetime(2024, 1, 1)
+    rows = [
+        # (id, user_id, root_id, parent_id, is_deleted)
+        (1, 1, 0, 0, 0),
+        (2, 2, 0, 0, 0),
+        (3, 3, 0, 0, 0),
+        (4, 2, 1, 1, 0),
+        (5, 3, 1, 4, 0),
+        (6, 1, 1, 1, 1),
+        (7, 3, 1, 1, 0),
+        (8, 1, 2, 2, 0),
+        (9, 1, 2, 2, 0),
+        (10, 2, 0, 0, 0),  # 其他提示词的评论
+    ]
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'comments.db'}")
+        async with engine.begin() as conn:
+            await conn.execute(text(_untyped_ddl(PromptComments.__table__)))
+            await conn.execute(text(_untyped_ddl(Users.__table__)))
+            await conn.execute(PromptComments.__table__.insert(), [
+                {
+                    "id": comment_id, "user_id": user_id, "prompt_id": 9 if comment_id == 10 else 7,
+                    "root_id": root_id, "parent_id": parent_id, "content": f"c{comment_id}",
+                    "likes_count": 0, "created_at": started + timedelta(minutes=comment_id), "is_deleted": is_deleted,
+                }
+                for comment_id, user_id, root_id, parent_id, is_deleted in rows
+            ])
+            await conn.execute(Users.__table__.insert(), [
+                {"id": user_id, "nickname": f"u{user_id}", "status": 1, "is_deleted": 0} for user_id in (1, 2, 3)
+            ])
+
+        try:
+            async with async_sessionmaker(engine)() as session:
+                return await PromptCommentService(session).get_comments(7, reply_limit=2)
+        finally:
+            await engine.dispose()
+
+    page = asyncio.run(main())
+    summary = [
+        (item["id"], item["reply_count"], [(reply["id"], reply["reply_to"]) for reply in item["replies"]])
+        for item in page["items"]
+    ]
+    assert summary == [
+        (3, 0, []),
+        (2, 2, [(8, None), (9, None)]),
+        (1, 3, [(4, None), (5, {"id": 2, "nickname": "u2"})]),
+    ]
+    assert page["next_cursor"] is None
@@ -0,0 +1,36 @@
+import orjson
+
+from app.core.responses import create_encoded_response
+from app.services.prompt.content import CachedContent
+
+
+def test_render_overlays_viewer_fields_on_encoded_body():
+    cached = CachedContent({
+        "id": 7,
+        "title": "翻译助手",
+        "content": [{"role": "system", "content": "你是一名资深翻译。"}],
+        "counts": {"comment": 1, "view": 10, "like": 2, "favorite": 3},
+        "author": {"id": 3, "nickname": "lex"},
+    })
+    cached.counts["view"] += 5
+
+    data = cached.render({
+        "counts": {**cached.counts, "view": cached.counts["view"] + 1},
+        "author": {**cached.author, "relation": {"is_followed": True}},
+        "is_liked": False,
+    })
+
+    assert orjson.loads(data) == {
+        "id": 7,
+        "title": "翻译助手",
+        "content": [{"role": "system", "content": "你是一名资深翻译。"}],
+        "counts": {"comment": 1, "view": 16, "like": 2, "favorite": 3},
+        "author": {"id": 3, "nickname": "lex", "relation": {"is_followed": True}},
+        "is_liked": False,
+    }
+
+
+def test_encoded_response_wraps_data():
+    response = create_encoded_response(b'{"id":7}')
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == {"code": 200, "msg": "成功", "data": {"id": 7}}
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.cursor import encode_cursor, decode_cursor
+
+FEED_TYPES = (int, (datetime, type(None)), int)
+
+
+def test_round_trip():
+    values = (12, datetime(2024, 5, 1, 8, 30), 99)
+    assert decode_cursor(encode_cursor(values), 3, FEED_TYPES) == list(values)
+
+
+def test_empty_cursor_is_first_page():
+    assert decode_cursor("", 3, FEED_TYPES) is None
+
+
+@pytest.mark.parametrize("values", [
+    (1, "x", 3),
+    (1, datetime(2024, 5, 1), "3"),
+    (True, datetime(2024, 5, 1), 3),
+    (1, [1], 3),
+    (1, 2),
+])
+def test_forged_cursor_raises_value_error(values):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(values), 3, FEED_TYPES)
+
+
+def test_invalid_token_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor!", 3, FEED_TYPES)
+
+
+def test_search_cursor_types():
+    types = ((int, float), int)
+    assert decode_cursor(encode_cursor((3.5, 7)), 2, types) == [3.5, 7]
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(("3.5", 7)), 2, types)
+
+
+def test_comment_cursor_types():
+    types = (datetime, int)
+    created_at = datetime(2024, 5, 1, 8, 30)
+    assert decode_cursor(encode_cursor((created_at, 7)), 2, types) == [created_at, 7]
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor((None, 7)), 2, types)
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import db
+
+marker = Table("marker", MetaData(), Column("id", Integer, primary_key=True), Column("source", String(20)))
+
+
+@pytest.fixture
+def routing(tmp_path, monkeypatch):
+    """主库和副本各一个SQLite数据库，marker 表记录数据来源"""
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    chosen = {"replica": replica}
+
+    async def setup():
+        for engine, source in ((primary, "primary"), (replica, "replica")):
+            async with engine.begin() as conn:
+                await conn.run_sync(marker.create)
+                await conn.execute(marker.insert().values(id=1, source=source))
+
+    asyncio.run(setup())
+    monkeypatch.setattr(db, "engine", primary)
+    monkeypatch.setattr(db, "replicas", SimpleNamespace(choose=lambda: chosen["replica"]))
+    sessions = async_sessionmaker(primary, class_=AsyncSession, sync_session_class=db.RoutingSession)
+    yield sessions, chosen
+
+    async def teardown():
+        await primary.dispose()
+        await replica.dispose()
+
+    asyncio.run(teardown())
+
+
+def _sources(sessions, write: bool = False, **info):
+    """依次执行读、（可选）写、读，返回两次读取的数据来源"""
+    async def main():
+        async with sessions() as session:
+            session.info.update(info)
+            query = select(marker.c.source).where(marker.c.id == 1)
+            before = (await session.execute(query)).scalar()
+            if write:
+                await session.execute(update(marker).where(marker.c.id == 2).values(source="x"))
+            after = (await session.execute(query)).scalar()
+            await session.rollback()
+            return before, after
+
+    return asyncio.run(main())
+
+
+def test_read_only_session_uses_replica(routing):
+    sessions, _ = routing
+    assert _sources(sessions, read_only=True) == ("replica", "replica")
+
+
+def test_default_session_uses_primary(routing):
+    sessions, _ = routing
+    assert _sources(sessions) == ("primary", "primary")
+
+
+def test_reads_after_write_use_primary(routing):
+    sessions, _ = routing
+    assert _sources(sessions, write=True, read_only=True) == ("replica", "primary")
+
+
+def test_no_available_replica_falls_back_to_primary(routing):
+    sessions, chosen = routing
+    chosen["replica"] = None
+    assert _sources(sessions, read_only=True) == ("primary", "primary")
@@ -0,0 +1,85 @@
+import asyncio
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from app.utils.email import EmailUtil
+
+
+class Handler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = Handler()
+    port = _free_port()
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=port,
+        authenticator=lambda server, session, envelope, mechanism, auth_data: AuthResult(success=True),
+        auth_require_tls=False,
+    )
+    controller.start()
+    try:
+        yield handler, port
+    finally:
+        controller.stop()
+
+
+def _email_util(port: int) -> EmailUtil:
+    # 本地测试服务器不加密
+    return EmailUtil("127.0.0.1", port, "noreply@example.com", "secret", use_protocol="none", pool_size=2)
+
+
+def test_pool_reuses_authenticated_connection(smtp_server):
+    handler, port = smtp_server
+    email_util = _email_util(port)
+
+    async def main():
+        try:
+            for i in range(5):
+                await email_util.send_email(["a@example.com"], f"subject {i}", "body")
+        finally:
+            await email_util.close()
+
+    asyncio.run(main())
+    stats = email_util.pool.stats()
+    assert len(handler.messages) == 5
+    assert len(handler.sessions) == 1
+    assert stats["connects"] == 1
+    assert stats["reuses"] == 4
+
+
+def test_pool_discards_failed_connection(smtp_server):
+    handler, port = smtp_server
+    email_util = _email_util(port)
+
+    async def main():
+        try:
+            with pytest.raises(RuntimeError):
+                async with email_util.pool.connection():
+                    raise RuntimeError("send failed")
+            await email_util.send_email(["a@example.com"], "subject", "body")
+        finally:
+            await email_util.close()
+
+    asyncio.run(main())
+    stats = email_util.pool.stats()
+    assert len(handler.messages) == 1
+    assert stats["discards"] == 1
+    assert stats["connects"] == 2
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Prompts, Users
+from app.services.prompt.recommend import PromptRecommendService
+
+
+def _untyped_ddl(table) -> str:
+    # 模型使用MySQL类型，SQLite中建无类型列即可
+    return f"CREATE TABLE {table.name} ({', '.join(column.name for column in table.columns)})"
+
+
+def test_cursor_pages_through_null_created_at(tmp_path):
+    rows = [
+        (1, 5, datetime(2024, 1, 2)),
+        (2, 5, datetime(2024, 1, 1)),
+        (3, 5, None),
+        (4, 5, None),
+        (5, 3, datetime(2024, 1, 3)),
+        (6, 3, None),
+    ]
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'feed.db'}")
+        async with engine.begin() as conn:
+            await conn.execute(text(_untyped_ddl(Prompts.__table__)))
+            await conn.execute(text(_untyped_ddl(Users.__table__)))
+            await conn.execute(Prompts.__table__.insert(), [
+                {"id": prompt_id, "user_id": 1, "view_count": view_count, "created_at": created_at, "status": 1, "is_deleted": 0}
+                for prompt_id, view_count, created_at in rows
+            ])
+
+        ids, cursor = [], ""
+        try:
+            async with async_sessionmaker(engine)() as session:
+                service = PromptRecommendService(session)
+                while cursor is not None:
+                    page = await service.get_recommend_prompts_by_cursor(cursor, page_size=2)
+                    ids.extend(item["id"] for item in page["items"])
+                    cursor = page["next_cursor"]
+        finally:
+            await engine.dispose()
+        return ids
+
+    # 浏览量倒序，浏览量相同时 created_at 倒序且 NULL 在最后，再按ID倒序
+    assert asyncio.run(main()) == [1, 2, 4, 3, 5, 6]
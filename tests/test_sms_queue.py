@@ -0,0 +1,93 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.utils.sms import SmsUtil, SmsDeliveryQueue, SmsStatusPoller
+
+
+class FakeDysmsClient:
+    """记录请求的阿里云短信客户端替身"""
+
+    def __init__(self, failures: int = 0):
+        self.batch_requests = []
+        self.failures = failures  # 前 failures 次请求失败
+
+    async def send_batch_sms_async(self, request):
+        self.batch_requests.append(request)
+        if len(self.batch_requests) <= self.failures:
+            raise ConnectionError("dysms unavailable")
+        return SimpleNamespace(body=SimpleNamespace(biz_id=f"biz-{len(self.batch_requests)}"))
+
+    async def query_send_details_async(self, request):
+        detail = {"PhoneNum": request.phone_number, "SendStatus": 3}
+        return SimpleNamespace(body=SimpleNamespace(to_map=lambda: {"SmsSendDetailDTOs": {"SmsSendDetailDTO": [detail]}}))
+
+
+def _sms_util(client: FakeDysmsClient) -> SmsUtil:
+    sms_util = SmsUtil("key", "secret", "LexTrade")
+    sms_util._client = client
+    return sms_util
+
+
+def test_queue_batches_by_template():
+    client = FakeDysmsClient()
+    poller = SmsStatusPoller(_sms_util(client))
+    queue = SmsDeliveryQueue(_sms_util(client), poller, max_delay=0.05)
+
+    async def main():
+        queue.start()
+        for i in range(150):
+            queue.enqueue(f"1380000{i:04d}", "VERIFY_CODE", {"code": f"{i:06d}"})
+        for i in range(5):
+            queue.enqueue(f"1390000{i:04d}", "NOTICE")
+        await queue.stop()
+        await poller.run_once()
+
+    asyncio.run(main())
+
+    sizes = {}
+    for request in client.batch_requests:
+        phones = json.loads(request.phone_number_json)
+        params = json.loads(request.template_param_json)
+        assert len(phones) == len(params) <= SmsUtil.BATCH_LIMIT
+        sizes.setdefault(request.template_code, []).append(len(phones))
+
+    assert sum(sizes["VERIFY_CODE"]) == 150
+    assert sum(sizes["NOTICE"]) == 5
+    assert len(client.batch_requests) <= 4
+    assert queue.stats()["sent"] == 155
+    assert poller.stats() == {"delivered": 155, "failed": 0, "expired": 0, "query_errors": 0, "pending": 0}
+
+
+def _send_one(client: FakeDysmsClient):
+    failed = []
+    queue = SmsDeliveryQueue(
+        _sms_util(client), max_delay=0.01, max_retries=2, retry_delay=0.01,
+        on_failed=lambda phone, template_code: failed.append(phone),
+    )
+
+    async def main():
+        queue.start()
+        queue.enqueue("13800000000", "VERIFY_CODE", {"code": "123456"})
+        await queue.stop()
+
+    asyncio.run(main())
+    return queue.stats(), failed
+
+
+def test_failed_batch_is_retried():
+    client = FakeDysmsClient(failures=2)
+    stats, failed = _send_one(client)
+    assert len(client.batch_requests) == 3
+    assert stats["sent"] == 1
+    assert stats["retries"] == 2
+    assert failed == []
+
+
+def test_exhausted_retries_report_failed_phones():
+    client = FakeDysmsClient(failures=10)
+    stats, failed = _send_one(client)
+    assert len(client.batch_requests) == 3
+    assert stats["sent"] == 0
+    assert stats["failed"] == 1
+    assert failed == ["13800000000"]
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.models import VerificationCodes
+from app.services import verification
+from app.services.verification import VerificationCodeService
+from app.utils.cache import TTLCache
+from app.utils.ratelimit import TokenBucketLimiter
+
+
+def test_consume_code_exactly_once(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'codes.db'}", connect_args={"timeout": 30})
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with engine.begin() as conn:
+            # 模型使用MySQL类型，SQLite中手动建表
+            await conn.execute(text(
+                "CREATE TABLE verification_codes (id INTEGER PRIMARY KEY, target VARCHAR(100), type INTEGER,"
+                " code CHAR(6), expired_at TIMESTAMP, created_at TIMESTAMP, is_used INTEGER DEFAULT 0)"
+            ))
+        async with sessions() as session:
+            session.add(VerificationCodes(
+                id=1, target="a@example.com", type=2, code="123456", is_used=0,
+                expired_at=datetime.utcnow() + timedelta(minutes=5),
+            ))
+            await session.commit()
+
+        async def consume():
+            async with sessions() as session:
+                return await VerificationCodeService(session)._consume_code("a@example.com", 2, "123456")
+
+        try:
+            return await asyncio.gather(*(consume() for _ in range(20)))
+        finally:
+            await engine.dispose()
+
+    assert sorted(asyncio.run(main())) == [False] * 19 + [True]
+
+
+@pytest.fixture
+def sender(monkeypatch):
+    """替换验证码写入和短信投递，记录实际生成的验证码"""
+    rows, messages = [], []
+
+    async def add(row):
+        rows.append(row)
+
+    monkeypatch.setattr(verification, "code_batcher", SimpleNamespace(add=add))
+    monkeypatch.setattr(verification, "sms_queue", SimpleNamespace(enqueue=lambda *args: messages.append(args)))
+    monkeypatch.setattr(verification, "recent_targets", TTLCache(ttl=60))
+    monkeypatch.setattr(verification, "target_limiter", TokenBucketLimiter(rate=0, capacity=2))
+    monkeypatch.setattr(verification, "ip_limiter", TokenBucketLimiter(rate=0, capacity=3))
+    return rows, messages
+
+
+def _create(phone: str, client_ip: str = "10.0.0.1"):
+    return asyncio.run(VerificationCodeService(None).create_sms_code(phone, client_ip=client_ip))
+
+
+def test_cooldown_dedupes_repeated_requests(sender):
+    rows, messages = sender
+    for _ in range(5):
+        assert _create("13800138000") is True
+    assert len(rows) == len(messages) == 1
+
+
+def test_target_limit_returns_429(sender):
+    rows, _ = sender
+    for _ in range(2):
+        _create("13800138000")
+        # 模拟冷却期结束
+        verification.recent_targets.invalidate("13800138000")
+    with pytest.raises(HTTPException) as exc_info:
+        _create("13800138000")
+    assert exc_info.value.status_code == 429
+    assert len(rows) == 2
+
+
+def test_ip_limit_returns_429_and_refunds_target(sender):
+    rows, _ = sender
+    for i in range(3):
+        _create(f"1380013800{i}")
+    with pytest.raises(HTTPException) as exc_info:
+        _create("13800138003")
+    assert exc_info.value.status_code == 429
+    # IP限流拒绝时归还目标令牌，也不进入冷却期
+    assert verification.target_limiter.allow("13800138003")
+    assert "13800138003" not in verification.recent_targets
+    assert len(rows) == 3